@@ -0,0 +1,299 @@
+import random
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from src.constants import WIN_SEQUENCE_LENGTH
+from src.geometry import get_geometry
+
+BoardState = Sequence[Sequence[int]]
+
+
+@lru_cache(maxsize=None)
+def _layout(rows: int, cols: int) -> Tuple[int, int, Tuple[int, ...]]:
+    """
+    Tính các mặt nạ cố định cho một kích thước bảng.
+    Mỗi cột chiếm (rows + 1) bit, bit thừa ở đỉnh cột là bit canh để phép dịch
+    không tràn sang cột bên cạnh. Trả về (bottom_mask, board_mask, shifts).
+    """
+    height = rows + 1
+    bottom = 0
+    for c in range(cols):
+        bottom |= 1 << (c * height)
+    board_mask = bottom * ((1 << rows) - 1)
+    # Dọc, ngang, chéo \ , chéo /
+    shifts = (1, height, height - 1, height + 1)
+    return bottom, board_mask, shifts
+
+
+@lru_cache(maxsize=None)
+def window_indices(rows: int, cols: int, win_length: int = WIN_SEQUENCE_LENGTH) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Các cửa sổ của `src.geometry` đổi sang chỉ số bit của BitBoard
+    (ô (r, c) với hàng 0 ở trên cùng -> bit c * (rows + 1) + rows - 1 - r).
+    """
+    geometry = get_geometry(rows, cols, win_length)
+    height = rows + 1
+    to_bit = [(cell % cols) * height + rows - 1 - cell // cols for cell in range(geometry.num_cells)]
+    return tuple(
+        tuple(to_bit[cell] for cell in geometry.window(w)) for w in range(geometry.num_windows)
+    )
+
+
+@lru_cache(maxsize=None)
+def _zobrist(
+    rows: int, cols: int
+) -> Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[int, ...], ...], int]:
+    """
+    Bảng số ngẫu nhiên 64 bit cho Zobrist hashing: một số cho mỗi (quân, bit),
+    cộng một số cho lượt đi của quân 2. Seed cố định để mọi tiến trình
+    tính ra cùng một hash cho cùng một thế cờ.
+    Bảng thứ hai là bảng thứ nhất đánh chỉ số theo ô đối xứng gương
+    (cột c <-> cột cols - 1 - c), dùng để cập nhật hash của ảnh gương.
+    """
+    rng = random.Random(0xC0FFEE ^ (rows << 8) ^ cols)
+    height = rows + 1
+    size = cols * height
+    table = (
+        (),
+        tuple(rng.getrandbits(64) for _ in range(size)),
+        tuple(rng.getrandbits(64) for _ in range(size)),
+    )
+    mirror = tuple(
+        index % height + (cols - 1 - index // height) * height for index in range(size)
+    )
+    mirrored = ((),) + tuple(tuple(values[mirror[index]] for index in range(size)) for values in table[1:])
+    return table, mirrored, rng.getrandbits(64)
+
+
+class BitBoard:
+    """
+    Biểu diễn bảng bằng hai số nguyên làm mặt nạ bit (mỗi quân một mặt nạ)
+    cùng chiều cao từng cột. Bit (c * (rows + 1) + h) là ô ở cột c, cách đáy h ô.
+    Hỗ trợ đi/hoàn tác nước đi tại chỗ nên tìm kiếm không cần sao chép bảng.
+    """
+
+    __slots__ = (
+        "rows",
+        "cols",
+        "win_length",
+        "height",
+        "pieces",
+        "mask",
+        "heights",
+        "moves",
+        "to_move",
+        "hash",
+        "mirror_hash",
+        "_shifts",
+        "_bottom",
+        "_board_mask",
+        "_zobrist",
+        "_zobrist_mirror",
+        "_zobrist_side",
+    )
+
+    def __init__(self, rows: int, cols: int, to_move: int = 1, win_length: int = WIN_SEQUENCE_LENGTH):
+        self.rows = rows
+        self.cols = cols
+        self.win_length = win_length
+        self.height = rows + 1
+        self.pieces = [0, 0, 0]  # chỉ số 1 và 2 là mặt nạ của hai quân
+        self.mask = 0
+        self.heights = [0] * cols
+        self.moves: List[int] = []
+        self.to_move = to_move
+        self._bottom, self._board_mask, self._shifts = _layout(rows, cols)
+        self._zobrist, self._zobrist_mirror, self._zobrist_side = _zobrist(rows, cols)
+        self.hash = self._zobrist_side if to_move == 2 else 0
+        # Hash của ảnh gương (cột c <-> cột cols - 1 - c), cập nhật song song với `hash`
+        self.mirror_hash = self.hash
+
+    @classmethod
+    def from_state(cls, state: BoardState, piece: int, win_length: int = WIN_SEQUENCE_LENGTH) -> "BitBoard":
+        """Chuyển bảng 2D (hàng 0 ở trên cùng) sang bitboard, `piece` là bên sắp đi."""
+        rows = len(state)
+        cols = len(state[0])
+        board = cls(rows, cols, piece, win_length)
+        for c in range(cols):
+            h = 0
+            for r in range(rows - 1, -1, -1):
+                value = state[r][c]
+                if value == 0:
+                    break
+                index = c * board.height + h
+                bit = 1 << index
+                board.pieces[value] |= bit
+                board.mask |= bit
+                board.hash ^= board._zobrist[value][index]
+                board.mirror_hash ^= board._zobrist_mirror[value][index]
+                h += 1
+            board.heights[c] = h
+        return board
+
+    def to_state(self) -> Tuple[Tuple[int, ...], ...]:
+        """Chuyển ngược về dạng tuple-of-tuples giống `Board.get_state()`."""
+        rows = []
+        for r in range(self.rows):
+            h = self.rows - 1 - r
+            row = []
+            for c in range(self.cols):
+                bit = 1 << (c * self.height + h)
+                if self.pieces[1] & bit:
+                    row.append(1)
+                elif self.pieces[2] & bit:
+                    row.append(2)
+                else:
+                    row.append(0)
+            rows.append(tuple(row))
+        return tuple(rows)
+
+    def bit_index(self, col: int, row_from_bottom: int) -> int:
+        """Chỉ số bit của ô (cột, hàng tính từ đáy)."""
+        return col * self.height + row_from_bottom
+
+    def can_play(self, col: int) -> bool:
+        return self.heights[col] < self.rows
+
+    def playable_columns(self) -> List[int]:
+        return [c for c in range(self.cols) if self.heights[c] < self.rows]
+
+    def is_full(self) -> bool:
+        return self.mask == self._board_mask
+
+    def play(self, col: int) -> int:
+        """Thả quân của bên đang đi vào cột `col`. Trả về chỉ số bit của ô vừa đặt."""
+        index = col * self.height + self.heights[col]
+        bit = 1 << index
+        piece = self.to_move
+        self.pieces[piece] |= bit
+        self.mask |= bit
+        side = self._zobrist_side
+        self.hash ^= self._zobrist[piece][index] ^ side
+        self.mirror_hash ^= self._zobrist_mirror[piece][index] ^ side
+        self.heights[col] += 1
+        self.moves.append(col)
+        self.to_move = 3 - piece
+        return index
+
+    def undo(self) -> int:
+        """Hoàn tác nước đi gần nhất. Trả về cột vừa được gỡ quân."""
+        col = self.moves.pop()
+        self.heights[col] -= 1
+        index = col * self.height + self.heights[col]
+        bit = 1 << index
+        piece = self.to_move = 3 - self.to_move
+        self.pieces[piece] ^= bit
+        self.mask ^= bit
+        side = self._zobrist_side
+        self.hash ^= self._zobrist[piece][index] ^ side
+        self.mirror_hash ^= self._zobrist_mirror[piece][index] ^ side
+        return col
+
+    def is_winner(self, piece: int) -> bool:
+        """Kiểm tra `piece` có đủ win_length quân liên tiếp bằng phép dịch bit."""
+        b = self.pieces[piece]
+        length = self.win_length
+        if length == 4:
+            for s in self._shifts:
+                m = b & (b >> s)
+                if m & (m >> 2 * s):
+                    return True
+            return False
+        for s in self._shifts:
+            m = b
+            for k in range(1, length):
+                m &= b >> (s * k)
+                if not m:
+                    break
+            if m:
+                return True
+        return False
+
+    def playable_mask(self) -> int:
+        """Mặt nạ các ô có thể đặt quân ngay (ô trống thấp nhất của mỗi cột chưa đầy)."""
+        return (self.mask + self._bottom) & self._board_mask
+
+    def winning_cells(self, piece: int) -> int:
+        """
+        Mặt nạ các ô trống mà nếu `piece` đặt vào thì hoàn thành một hàng
+        win_length quân (kể cả ô chưa thể đặt ngay vì cột còn thấp).
+        """
+        b = self.pieces[piece]
+        length = self.win_length
+        if length == 4:
+            return self._winning_cells_4(b)
+        result = 0
+        for s in self._shifts:
+            # Ô trống ở vị trí gap trong cửa sổ, các vị trí còn lại đều là quân `piece`
+            for gap in range(length):
+                m = -1
+                for i in range(length):
+                    if i == gap:
+                        continue
+                    offset = (i - gap) * s
+                    m &= (b >> offset) if offset > 0 else (b << -offset)
+                    if not m:
+                        break
+                result |= m
+        return result & (self._board_mask ^ self.mask)
+
+    def _winning_cells_4(self, b: int) -> int:
+        """Bản chuyên biệt của `winning_cells` cho hàng 4 quân (ít phép dịch hơn)."""
+        # Dọc: chỉ ô ngay trên 3 quân liên tiếp
+        result = (b << 1) & (b << 2) & (b << 3)
+        for s in self._shifts[1:]:
+            pair = (b << s) & (b << 2 * s)
+            result |= pair & (b << 3 * s)
+            result |= pair & (b >> s)
+            pair = (b >> s) & (b >> 2 * s)
+            result |= pair & (b << s)
+            result |= pair & (b >> 3 * s)
+        return result & (self._board_mask ^ self.mask)
+
+    def last_mover_won(self) -> bool:
+        """Bên vừa đi (không phải bên sắp đi) đã thắng chưa."""
+        return self.is_winner(3 - self.to_move)
+
+    def key(self) -> int:
+        """
+        Khóa duy nhất của thế cờ theo góc nhìn bên sắp đi
+        (không phụ thuộc màu quân): quân bên sắp đi + mặt nạ ô đã đầy.
+        """
+        return self.pieces[self.to_move] + self.mask
+
+    def mirror_key(self) -> int:
+        """`key()` của ảnh gương: đảo thứ tự các khối cột (rows + 1) bit."""
+        key = self.pieces[self.to_move] + self.mask
+        height = self.height
+        column = (1 << height) - 1
+        last = self.cols - 1
+        mirrored = 0
+        for c in range(self.cols):
+            mirrored |= ((key >> (c * height)) & column) << ((last - c) * height)
+        return mirrored
+
+    def canonical_key(self) -> Tuple[int, bool]:
+        """
+        Khóa chuẩn của thế cờ và ảnh gương của nó: min(key, mirror_key), kèm cờ
+        cho biết khóa chuẩn có phải của ảnh gương không (để đổi nước đi bằng `orient`).
+        """
+        key = self.key()
+        mirrored = self.mirror_key()
+        if mirrored < key:
+            return mirrored, True
+        return key, False
+
+    def canonical_hash(self) -> Tuple[int, bool]:
+        """Như `canonical_key` nhưng cho Zobrist hash: min(hash, mirror_hash) và cờ ảnh gương."""
+        if self.mirror_hash < self.hash:
+            return self.mirror_hash, True
+        return self.hash, False
+
+    def orient(self, col: Optional[int], mirrored: bool) -> Optional[int]:
+        """
+        Đổi cột giữa hướng thật và hướng của khóa chuẩn (phép lật là nghịch đảo
+        của chính nó nên dùng được cho cả hai chiều). None giữ nguyên.
+        """
+        if mirrored and col is not None:
+            return self.cols - 1 - col
+        return col
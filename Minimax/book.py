@@ -0,0 +1,208 @@
+"""
+Sách khai cuộc: công cụ sinh offline và tra cứu bằng mmap.
+
+Sinh sách (chạy một lần, song song trên mọi lõi):
+
+    python -m Minimax.book --plies 6 --depth 12 --out Minimax/opening_book.bin
+
+Tệp gồm một header cố định và các bản ghi 16 byte (khóa thế cờ, nước tốt
+nhất, điểm) sắp xếp theo khóa, nên có thể tra bằng tìm kiếm nhị phân trực tiếp
+trên vùng nhớ mmap mà không cần nạp vào heap của Python. Với số cột lẻ, thế cờ
+và ảnh gương của nó chung một bản ghi (khóa `BitBoard.canonical_key()`), nên
+sách chỉ cần khoảng một nửa số bản ghi. Với số cột chẵn, điểm heuristic của hai
+ảnh gương khác nhau nên mỗi hướng có bản ghi riêng (khóa `BitBoard.key()`).
+"""
+import argparse
+import mmap
+import multiprocessing
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Minimax.bitboard import BitBoard
+from Minimax.minimax import _BitboardSearch
+from Minimax.transposition import TranspositionTable
+from src.constants import BOARD_SIZE
+
+MAGIC = b"C4BK"
+VERSION = 3  # 2: khóa chuẩn theo phép lật gương; 3: chỉ khi số cột lẻ
+# magic, version, rows, cols, số bản ghi
+HEADER = struct.Struct("<4sHBBI")
+# khóa (book_key()), nước tốt nhất theo hướng của khóa, điểm theo góc nhìn bên sắp đi
+RECORD = struct.Struct("<Qbxxxi")
+_KEY = struct.Struct("<Q")
+
+_worker_table: Optional[TranspositionTable] = None
+
+
+def book_key(board: BitBoard) -> Tuple[int, bool]:
+    """
+    Khóa sách của thế cờ, kèm cờ ảnh gương như `BitBoard.canonical_key()`.
+    Chỉ gộp ảnh gương khi số cột lẻ, giống `_BitboardSearch.mirror_keys`: điểm trong
+    sách là điểm heuristic, mà với số cột chẵn hai ảnh gương có điểm khác nhau.
+    """
+    if board.cols % 2 == 1:
+        return board.canonical_key()
+    return board.key(), False
+
+
+class OpeningBook:
+    """Sách khai cuộc chỉ đọc, ánh xạ bằng mmap và tra bằng tìm kiếm nhị phân."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Opening book {path} is empty")
+        magic, version, self.rows, self.cols, self.count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not an opening book (version {VERSION})")
+        if len(self._data) != HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(f"Opening book {path} is truncated")
+
+    def close(self) -> None:
+        self._data.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def lookup(self, key: int) -> Optional[Tuple[int, int]]:
+        """Trả về (nước tốt nhất, điểm) của khóa `key`, hoặc None nếu không có trong sách."""
+        data = self._data
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (mid_key,) = _KEY.unpack_from(data, HEADER.size + mid * RECORD.size)
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                _, move, score = RECORD.unpack_from(data, HEADER.size + mid * RECORD.size)
+                return move, score
+        return None
+
+    def probe(self, board: BitBoard) -> Optional[Tuple[int, int]]:
+        """
+        Tra thế cờ của một BitBoard (None nếu khác kích thước sách hoặc không có);
+        nước đi được lật về hướng thật của bảng.
+        """
+        if board.rows != self.rows or board.cols != self.cols:
+            return None
+        key, mirrored = book_key(board)
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        return board.orient(entry[0], mirrored), entry[1]
+
+
+def enumerate_positions(rows: int, cols: int, max_plies: int) -> Dict[int, Tuple[int, ...]]:
+    """
+    Mọi thế cờ chưa kết thúc có tối đa `max_plies` quân, đi từ bảng trống.
+    Trả về {khóa sách: một dãy nước dẫn tới thế cờ}; thế cờ hoán vị (và ảnh gương khi số cột lẻ)
+    chỉ giữ một lần.
+    """
+    positions: Dict[int, Tuple[int, ...]] = {}
+    frontier: List[Tuple[int, ...]] = [()]
+    board = BitBoard(rows, cols)
+    for ply in range(max_plies + 1):
+        next_frontier = []
+        for line in frontier:
+            for col in line:
+                board.play(col)
+            key, _ = book_key(board)
+            if key not in positions:
+                positions[key] = line
+                if ply < max_plies:
+                    for col in board.playable_columns():
+                        mover = board.to_move
+                        board.play(col)
+                        if not board.is_winner(mover) and not board.is_full():
+                            next_frontier.append(line + (col,))
+                        board.undo()
+            for _ in line:
+                board.undo()
+        frontier = next_frontier
+    return positions
+
+
+def _init_worker(table_size_mb: float) -> None:
+    global _worker_table
+    _worker_table = TranspositionTable(table_size_mb)
+
+
+def _solve(task: Tuple[int, int, Tuple[int, ...], int]) -> Tuple[int, int, int]:
+    """Chạy trong tiến trình con: tìm sâu một thế cờ, trả về (khóa sách, nước theo hướng của khóa, điểm)."""
+    rows, cols, line, depth = task
+    board = BitBoard(rows, cols)
+    for col in line:
+        board.play(col)
+    key, mirrored = book_key(board)
+    # Các việc đến theo thứ tự bất kỳ nên không có ô nào chắc chắn hết dùng: chỉ ưu tiên độ sâu
+    _worker_table.new_search(0)
+    search = _BitboardSearch(board, _worker_table)
+    col, value = search.search_root(depth, range(cols))
+    return key, board.orient(col, mirrored), int(value)
+
+
+def write_book(path: str, rows: int, cols: int, entries: Iterable[Tuple[int, int, int]]) -> int:
+    """Ghi sách từ các bộ (khóa, nước, điểm); tự sắp xếp theo khóa. Trả về số bản ghi."""
+    records = sorted(entries)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, rows, cols, len(records)))
+        for key, move, score in records:
+            f.write(RECORD.pack(key, move, score))
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def generate_book(
+    path: str,
+    max_plies: int,
+    depth: int,
+    rows: int = BOARD_SIZE[0],
+    cols: int = BOARD_SIZE[1],
+    workers: Optional[int] = None,
+    table_size_mb: float = 64,
+) -> int:
+    """Liệt kê thế cờ tới `max_plies`, tìm sâu `depth` song song và ghi sách ra `path`."""
+    if cols * (rows + 1) > 64:
+        raise ValueError("Board is too large for 64-bit position keys")
+    positions = enumerate_positions(rows, cols, max_plies)
+    tasks = [(rows, cols, line, depth) for line in positions.values()]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(table_size_mb,),
+    ) as pool:
+        entries = list(pool.map(_solve, tasks, chunksize=16))
+    return write_book(path, rows, cols, entries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a Connect 4 opening book")
+    parser.add_argument("--plies", type=int, default=6, help="deepest opening ply stored in the book")
+    parser.add_argument("--depth", type=int, default=12, help="search depth used for every position")
+    parser.add_argument("--rows", type=int, default=BOARD_SIZE[0])
+    parser.add_argument("--cols", type=int, default=BOARD_SIZE[1])
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--out", default="Minimax/opening_book.bin")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = generate_book(args.out, args.plies, args.depth, args.rows, args.cols, args.workers)
+    print(f"Wrote {count} positions to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
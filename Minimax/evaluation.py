@@ -0,0 +1,91 @@
+from typing import Sequence
+
+from Minimax.bitboard import BitBoard
+from src.geometry import get_geometry
+
+
+class IncrementalEvaluator:
+    """
+    Điểm heuristic cập nhật tăng dần, cho kết quả giống hệt `_score_position`.
+
+    Giữ số quân của mỗi bên trong từng cửa sổ 4 ô và tổng điểm theo góc nhìn
+    của cả hai quân (`scores[1]`, `scores[2]`). Mỗi lần đặt/gỡ một quân chỉ
+    duyệt các cửa sổ đi qua ô đó, nên đánh giá nút lá chỉ là một phép đọc.
+    """
+
+    def __init__(self, rows: int, cols: int, window_scores: Sequence[Sequence[int]], center_weight: int = 6):
+        geometry = get_geometry(rows, cols, 4)
+        num_windows = geometry.num_windows
+        height = rows + 1
+        # Chỉ mục ngược ô -> cửa sổ của geometry, đánh lại theo chỉ số bit
+        self.cell_windows = [()] * (cols * height)
+        for cell in range(geometry.num_cells):
+            r, c = divmod(cell, cols)
+            self.cell_windows[c * height + rows - 1 - r] = geometry.windows_through(cell)
+        center = cols // 2
+        self.center_cells = frozenset(center * height + h for h in range(rows))
+        self.center_weight = center_weight
+
+        # Chênh lệch điểm khi một cửa sổ có (own, opp) quân nhận thêm một quân của own,
+        # tính theo góc nhìn của own và của đối thủ.
+        self._gain_own = [[0] * 5 for _ in range(5)]
+        self._gain_opp = [[0] * 5 for _ in range(5)]
+        for own in range(4):
+            for opp in range(4 - own):
+                self._gain_own[own][opp] = window_scores[own + 1][opp] - window_scores[own][opp]
+                self._gain_opp[own][opp] = window_scores[opp][own + 1] - window_scores[opp][own]
+
+        self.counts = [None, [0] * num_windows, [0] * num_windows]
+        self.scores = [0, 0, 0]
+        # Cửa sổ rỗng vẫn có điểm riêng (0 với bộ trọng số hiện tại)
+        self.scores[1] = self.scores[2] = window_scores[0][0] * num_windows
+
+    @classmethod
+    def from_board(cls, board: BitBoard, window_scores: Sequence[Sequence[int]], center_weight: int = 6) -> "IncrementalEvaluator":
+        """Khởi tạo từ một BitBoard có sẵn quân."""
+        evaluator = cls(board.rows, board.cols, window_scores, center_weight)
+        for piece in (1, 2):
+            pieces = board.pieces[piece]
+            while pieces:
+                low = pieces & -pieces
+                evaluator.add(low.bit_length() - 1, piece)
+                pieces ^= low
+        return evaluator
+
+    def add(self, index: int, piece: int) -> None:
+        """Cập nhật khi `piece` được đặt vào ô có chỉ số bit `index`."""
+        own_counts = self.counts[piece]
+        opp_counts = self.counts[3 - piece]
+        gain_own = self._gain_own
+        gain_opp = self._gain_opp
+        delta_own = 0
+        delta_opp = 0
+        for w in self.cell_windows[index]:
+            own = own_counts[w]
+            opp = opp_counts[w]
+            delta_own += gain_own[own][opp]
+            delta_opp += gain_opp[own][opp]
+            own_counts[w] = own + 1
+        if index in self.center_cells:
+            delta_own += self.center_weight
+        self.scores[piece] += delta_own
+        self.scores[3 - piece] += delta_opp
+
+    def remove(self, index: int, piece: int) -> None:
+        """Hoàn tác `add(index, piece)`."""
+        own_counts = self.counts[piece]
+        opp_counts = self.counts[3 - piece]
+        gain_own = self._gain_own
+        gain_opp = self._gain_opp
+        delta_own = 0
+        delta_opp = 0
+        for w in self.cell_windows[index]:
+            own = own_counts[w] - 1
+            opp = opp_counts[w]
+            delta_own += gain_own[own][opp]
+            delta_opp += gain_opp[own][opp]
+            own_counts[w] = own
+        if index in self.center_cells:
+            delta_own += self.center_weight
+        self.scores[piece] -= delta_own
+        self.scores[3 - piece] -= delta_opp
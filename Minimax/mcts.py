@@ -0,0 +1,359 @@
+"""
+Monte Carlo Tree Search (UCT) trên BitBoard, song song ở gốc trên một process pool.
+
+Mỗi vòng lặp: chọn đường đi bằng UCT tới một nút chưa mở hết, mở một nước
+con, chơi thử (rollout) tới hết ván rồi cộng kết quả ngược lên gốc. Rollout
+không hoàn toàn ngẫu nhiên: bên sắp đi thắng ngay nếu được, chặn nếu đối thủ
+có ô thắng đặt được, còn lại chọn ngẫu nhiên một cột.
+"""
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Minimax.bitboard import BitBoard, BoardState
+
+# Hằng số khám phá của UCT cho phần thưởng trong [0, 1]
+EXPLORATION = math.sqrt(2)
+# Số vòng lặp giữa hai lần đọc đồng hồ / kiểm tra hủy (lũy thừa của 2 trừ 1)
+_CLOCK_CHECK_MASK = 63
+# Số nút tối đa của một cây (khoảng 300 byte mỗi nút)
+DEFAULT_MAX_NODES = 400_000
+
+
+class _Node:
+    """Nút của cây: `reward` là tổng phần thưởng theo góc nhìn bên đã đi nước `move` vào nút."""
+
+    __slots__ = ("move", "parent", "mover", "children", "untried", "visits", "reward", "winner")
+
+    def __init__(self, move: Optional[int], parent: Optional["_Node"], mover: int):
+        self.move = move
+        self.parent = parent
+        self.mover = mover
+        self.children: List["_Node"] = []
+        self.untried: List[int] = []
+        self.visits = 0
+        self.reward = 0.0
+        self.winner: Optional[int] = None  # 0 hòa, 1/2 bên thắng nếu nút là thế cờ kết thúc
+
+
+class MCTSTree:
+    """
+    Cây UCT của một thế cờ gốc, chạy tại chỗ trên một BitBoard (đi/hoàn tác).
+    `root_moves`: chỉ mở các nước gốc này (mặc định mọi cột còn đi được).
+    Khi cây đạt `max_nodes` nút thì không mở thêm nút; các vòng lặp vẫn chơi
+    thử từ nút lá nên cây tiếp tục tinh chỉnh thống kê. `advance` dời gốc xuống
+    thế cờ thật ở nước sau để dùng lại cây con, các nhánh còn lại được giải phóng.
+    """
+
+    def __init__(
+        self,
+        board: BitBoard,
+        root_moves: Optional[Sequence[int]] = None,
+        exploration: float = EXPLORATION,
+        seed: Optional[int] = None,
+        max_nodes: int = DEFAULT_MAX_NODES,
+    ):
+        self.board = board
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.max_nodes = max_nodes
+        self.size = 1
+        self.iterations = 0
+        self.root = _Node(None, None, 3 - board.to_move)
+        moves = board.playable_columns()
+        if root_moves is not None:
+            moves = [c for c in moves if c in root_moves]
+        self.rng.shuffle(moves)
+        self.root.untried = moves
+
+    def run(
+        self,
+        iterations: Optional[int] = None,
+        deadline: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Chạy tới khi đủ `iterations` vòng, quá `deadline` (time.perf_counter)
+        hoặc `stop` được đặt; không giới hạn nào thì chạy một vòng. Trả về số vòng đã chạy.
+        """
+        if iterations is None and deadline is None and stop is None:
+            iterations = 1
+        done = 0
+        while iterations is None or done < iterations:
+            if not done & _CLOCK_CHECK_MASK and done and (
+                (deadline is not None and time.perf_counter() > deadline)
+                or (stop is not None and stop.is_set())
+            ):
+                break
+            self._iterate()
+            done += 1
+        self.iterations += done
+        return done
+
+    def _iterate(self) -> None:
+        board = self.board
+        node = self.root
+        played = 0
+        # Chọn: đi xuống theo UCT khi nút đã mở hết các nước
+        while not node.untried and node.children and node.winner is None:
+            node = self._select(node)
+            board.play(node.move)
+            played += 1
+        # Mở rộng một nước con
+        if node.untried and node.winner is None and self.size < self.max_nodes:
+            self.size += 1
+            col = node.untried.pop()
+            mover = board.to_move
+            board.play(col)
+            played += 1
+            child = _Node(col, node, mover)
+            if board.is_winner(mover):
+                child.winner = mover
+            elif board.is_full():
+                child.winner = 0
+            else:
+                child.untried = board.playable_columns()
+                self.rng.shuffle(child.untried)
+            node.children.append(child)
+            node = child
+        winner = node.winner if node.winner is not None else _rollout(board, self.rng)
+        for _ in range(played):
+            board.undo()
+        # Cộng ngược kết quả
+        while node is not None:
+            node.visits += 1
+            if winner == node.mover:
+                node.reward += 1.0
+            elif winner == 0:
+                node.reward += 0.5
+            node = node.parent
+
+    def _select(self, node: _Node) -> _Node:
+        scale = self.exploration * math.sqrt(math.log(node.visits))
+        best = None
+        best_score = -math.inf
+        for child in node.children:
+            score = child.reward / child.visits + scale / math.sqrt(child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def advance(self, board: BitBoard, root_moves: Optional[Sequence[int]] = None) -> bool:
+        """
+        Dời gốc tới thế cờ của `board` nếu nó là gốc hiện tại hoặc một nút con/cháu
+        (tức sau nước của mình và nước đáp của đối thủ) và giải phóng các nhánh
+        khác. Trả về False nếu không tìm thấy (khi đó cây
+        không dùng lại được) hoặc nếu `root_moves` không phải mọi cột còn đi được.
+        """
+        own = self.board
+        target = (board.pieces[1], board.pieces[2])
+        if root_moves is not None and any(c not in root_moves for c in board.playable_columns()):
+            return False
+        path: Optional[List[int]] = None
+        if (own.pieces[1], own.pieces[2]) == target:
+            path = []
+        for child in self.root.children:
+            if path is not None:
+                break
+            own.play(child.move)
+            if (own.pieces[1], own.pieces[2]) == target:
+                path = [child.move]
+            for grandchild in child.children:
+                if path is not None:
+                    break
+                own.play(grandchild.move)
+                if (own.pieces[1], own.pieces[2]) == target:
+                    path = [child.move, grandchild.move]
+                own.undo()
+            own.undo()
+        if path is None:
+            return False
+
+        node = self.root
+        for col in path:
+            node = next(child for child in node.children if child.move == col)
+            own.play(col)
+        _release(self.root, node)
+        node.parent = None
+        self.root = node
+        # Đếm lại số nút của cây con được giữ
+        size = 0
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            size += 1
+            stack.extend(current.children)
+        self.size = size
+        return True
+
+    def discard(self) -> None:
+        """Giải phóng toàn bộ cây (cây không dùng được nữa)."""
+        _release(self.root, None)
+        self.root = _Node(None, None, 3 - self.board.to_move)
+        self.size = 1
+
+    def root_stats(self) -> List[Tuple[int, int, float]]:
+        """(cột, số lần thăm, tổng phần thưởng theo góc nhìn bên sắp đi ở gốc) của mỗi nước gốc đã mở."""
+        return [(child.move, child.visits, child.reward) for child in self.root.children]
+
+
+def _release(root: _Node, keep: Optional[_Node]) -> None:
+    """
+    Cắt liên kết cha/con của cây `root` trừ cây con `keep`, để bộ đếm tham chiếu
+    giải phóng các nút ngay thay vì chờ bộ thu gom chu trình.
+    """
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is keep:
+            continue
+        stack.extend(node.children)
+        node.children = []
+        node.parent = None
+
+
+def _rollout(board: BitBoard, rng: random.Random) -> int:
+    """Chơi thử tới hết ván từ thế cờ hiện tại; trả về bên thắng (0 nếu hòa). Bảng được khôi phục."""
+    height = board.height
+    rows = board.rows
+    heights = board.heights
+    columns = range(board.cols)
+    played = 0
+    while True:
+        piece = board.to_move
+        playable = board.playable_mask()
+        if not playable:
+            winner = 0
+            break
+        if board.winning_cells(piece) & playable:
+            winner = piece
+            break
+        threats = board.winning_cells(3 - piece) & playable
+        if threats:
+            # Chặn ô thắng thấp nhất (có hai ô trở lên thì đằng nào cũng thua)
+            col = ((threats & -threats).bit_length() - 1) // height
+        else:
+            col = rng.choice([c for c in columns if heights[c] < rows])
+        board.play(col)
+        played += 1
+    for _ in range(played):
+        board.undo()
+    return winner
+
+
+def _search_tree(
+    state: BoardState,
+    piece: int,
+    root_moves: Sequence[int],
+    iterations: Optional[int],
+    time_left: Optional[float],
+    exploration: float,
+    seed: int,
+    max_nodes: int,
+) -> List[Tuple[int, int, float]]:
+    """Chạy trong tiến trình con: một cây độc lập, trả về thống kê các nước gốc."""
+    tree = MCTSTree(BitBoard.from_state(state, piece), root_moves, exploration, seed, max_nodes)
+    deadline = None if time_left is None else time.perf_counter() + time_left
+    tree.run(iterations, deadline)
+    return tree.root_stats()
+
+
+class MCTSSearch:
+    """
+    MCTS song song ở gốc: mỗi tiến trình con xây một cây riêng (seed khác nhau)
+    từ cùng thế cờ gốc, rồi số lần thăm và phần thưởng của các nước gốc được
+    cộng lại; nước được chọn là nước được thăm nhiều nhất. Với `workers` = 1,
+    cây được chạy ngay trong tiến trình hiện tại (hủy được bằng `stop`) và, nếu
+    `reuse_tree`, được giữ tới lần gọi sau: gốc được dời xuống thế cờ thật (sau
+    nước của mình và nước đáp) và các vòng lặp mới cộng tiếp vào thống kê cũ.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = 1,
+        exploration: float = EXPLORATION,
+        seed: Optional[int] = None,
+        reuse_tree: bool = True,
+        max_nodes: int = DEFAULT_MAX_NODES,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.reuse_tree = reuse_tree
+        self.max_nodes = max_nodes
+        self.tree: Optional[MCTSTree] = None
+        self.iterations = 0
+        self.reused = 0  # số lần thăm gốc được giữ lại từ lần gọi trước
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """Tạo pool ở lần dùng đầu tiên; "spawn" để tiến trình con không kế thừa pygame/TensorFlow."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def close(self) -> None:
+        """Dừng các tiến trình con."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def search(
+        self,
+        state: BoardState,
+        piece: int,
+        allowed_actions: Sequence[int],
+        iterations: Optional[int] = None,
+        time_ms: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Tuple[Optional[int], Dict[int, Tuple[int, float]]]:
+        """
+        Chạy `iterations` vòng (chia đều cho các tiến trình) và/hoặc trong `time_ms`.
+        Trả về (nước được thăm nhiều nhất, {cột: (số lần thăm, tỉ lệ thắng)}).
+        """
+        board = BitBoard.from_state(state, piece)
+        moves = [c for c in board.playable_columns() if c in allowed_actions]
+        if not moves or board.is_winner(1) or board.is_winner(2):
+            return None, {}
+        deadline = None if time_ms is None else time.perf_counter() + time_ms / 1000.0
+        totals: Dict[int, List[float]] = {}
+        self.reused = 0
+        if self.workers == 1:
+            tree = self.tree
+            if tree is not None and tree.advance(board, allowed_actions):
+                self.reused = tree.root.visits
+            else:
+                if tree is not None:
+                    tree.discard()
+                tree = MCTSTree(board, moves, self.exploration, self.rng.getrandbits(32), self.max_nodes)
+            self.tree = tree if self.reuse_tree else None
+            tree.run(iterations, deadline, stop)
+            results = [tree.root_stats()]
+        else:
+            share = None if iterations is None else -(-iterations // self.workers)
+            time_left = None if time_ms is None else time_ms / 1000.0
+            pool = self._executor()
+            futures = [
+                pool.submit(
+                    _search_tree, state, piece, moves, share, time_left,
+                    self.exploration, self.rng.getrandbits(32), self.max_nodes,
+                )
+                for _ in range(self.workers)
+            ]
+            results = [future.result() for future in futures]
+        for stats in results:
+            for col, visits, reward in stats:
+                total = totals.setdefault(col, [0, 0.0])
+                total[0] += visits
+                total[1] += reward
+        summary = {col: (int(visits), reward / visits) for col, (visits, reward) in totals.items() if visits}
+        self.iterations = sum(visits for visits, _ in summary.values())
+        if not summary:
+            return moves[0], summary
+        best = max(summary, key=lambda col: (summary[col][0], summary[col][1]))
+        return best, summary
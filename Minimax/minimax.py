@@ -1,6 +1,24 @@
 import math
 import random
-from typing import List, Optional, Sequence, Tuple
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from Minimax.batch_eval import BatchEvaluator
+from Minimax.bitboard import BitBoard, window_indices
+from Minimax.evaluation import IncrementalEvaluator
+from Minimax.ordering import MoveOrderer
+from Minimax.stats import JsonLinesTrace, SearchStats
+from Minimax.threats import safe_moves_mask
+from Minimax.transposition import EXACT, LOWER, NO_MOVE, UPPER, TranspositionTable
+from src.geometry import get_geometry
+
+if TYPE_CHECKING:
+    from Minimax.solved_cache import SolvedCache
+    from Minimax.solver import Solver
 
 BoardState = Sequence[Sequence[int]]
 
@@ -32,29 +50,13 @@ def _drop_piece(board: List[List[int]], col: int, piece: int) -> bool:
 
 
 def _winning_move(board: List[List[int]], piece: int) -> bool:
-    """Kiểm tra 4 điều kiện thắng cho piece: ngang, dọc, chéo /, chéo \."""
-    rows = len(board)
-    cols = len(board[0])
-    # Kiểm tra ngang
-    for r in range(rows):
-        for c in range(cols - 3):
-            if all(board[r][c + i] == piece for i in range(4)):
-                return True
-    # Kiểm tra dọc
-    for c in range(cols):
-        for r in range(rows - 3):
-            if all(board[r + i][c] == piece for i in range(4)):
-                return True
-    # Kiểm tra chéo /
-    for r in range(3, rows):
-        for c in range(cols - 3):
-            if all(board[r - i][c + i] == piece for i in range(4)):
-                return True
-    # Kiểm tra chéo \
-    for r in range(rows - 3):
-        for c in range(cols - 3):
-            if all(board[r + i][c + i] == piece for i in range(4)):
-                return True
+    """Kiểm tra 4 điều kiện thắng cho piece: ngang, dọc, chéo /, chéo \\ (dùng bảng cửa sổ tính sẵn)."""
+    geometry = get_geometry(len(board), len(board[0]), 4)
+    cells = [value for row in board for value in row]
+    window_cells = geometry.window_cells
+    for start in range(0, len(window_cells), 4):
+        if all(cells[window_cells[i]] == piece for i in range(start, start + 4)):
+            return True
     return False
 
 
@@ -86,36 +88,20 @@ def _evaluate_window(window: List[int], piece: int) -> int:
 
 
 def _score_position(board: List[List[int]], piece: int) -> int:
-    """Duyệt tất cả các cửa sổ 4 ô và tính điểm heuristic."""
-    score = 0
-    rows = len(board)
-    cols = len(board[0])
-    center_col = cols // 2
+    """Duyệt tất cả các cửa sổ 4 ô (lấy từ bảng cửa sổ tính sẵn) và tính điểm heuristic."""
+    geometry = get_geometry(len(board), len(board[0]), 4)
+    cells = [value for row in board for value in row]
+    center_col = len(board[0]) // 2
 
-    center_column_values = [board[r][center_col] for r in range(rows)]
+    center_column_values = [row[center_col] for row in board]
     center_count = center_column_values.count(piece)
-    score += center_count * 6
-    
-    for r in range(rows):
-        for c in range(cols - 3):
-            window = board[r][c : c + 4]
-            score += _evaluate_window(window, piece)
-            
-    for c in range(cols):
-        for r in range(rows - 3):
-            window = [board[r + i][c] for i in range(4)]
-            score += _evaluate_window(window, piece)
-            
-    for r in range(3, rows):
-        for c in range(cols - 3):
-            window = [board[r - i][c + i] for i in range(4)]
-            score += _evaluate_window(window, piece)
-            
-    for r in range(rows - 3):
-        for c in range(cols - 3):
-            window = [board[r + i][c + i] for i in range(4)]
-            score += _evaluate_window(window, piece)
-            
+    score = center_count * 6
+
+    window_cells = geometry.window_cells
+    for start in range(0, len(window_cells), 4):
+        window = [cells[i] for i in window_cells[start : start + 4]]
+        score += _evaluate_window(window, piece)
+
     return score
 
 def _is_terminal_node(board: List[List[int]], piece: int) -> bool:
@@ -227,19 +213,570 @@ def _minimax(
     
 
 
+WIN_SCORE = 1_000_000
+
+
+def _window_score_table() -> List[List[int]]:
+    """
+    Bảng điểm cửa sổ theo (số quân mình, số quân đối thủ), tính sẵn từ
+    `_evaluate_window` để hai cách đánh giá luôn dùng chung một bộ trọng số.
+    """
+    table = [[0] * 5 for _ in range(5)]
+    for own in range(5):
+        for opp in range(5 - own):
+            window = [1] * own + [2] * opp + [0] * (4 - own - opp)
+            table[own][opp] = _evaluate_window(window, 1)
+    return table
+
+
+_WINDOW_SCORES = _window_score_table()
+
+
+@lru_cache(maxsize=None)
+def _window_masks(rows: int, cols: int) -> Tuple[int, ...]:
+    """Mặt nạ bit của mọi cửa sổ 4 ô (ngang, dọc, chéo /, chéo \\) trên bitboard."""
+    return tuple(sum(1 << index for index in window) for window in window_indices(rows, cols, 4))
+
+
+def _bitboard_score(board: BitBoard, piece: int) -> int:
+    """Giống hệt `_score_position` nhưng đếm quân trong cửa sổ bằng popcount."""
+    own = board.pieces[piece]
+    opp = board.pieces[3 - piece]
+    center_mask = ((1 << board.rows) - 1) << ((board.cols // 2) * board.height)
+    score = (own & center_mask).bit_count() * 6
+    scores = _WINDOW_SCORES
+    for w in _window_masks(board.rows, board.cols):
+        score += scores[(own & w).bit_count()][(opp & w).bit_count()]
+    return score
+
+
+def _prune_losing(
+    board: BitBoard, moves: List[int], own_win: Optional[int] = None, opp_win: Optional[int] = None
+) -> List[int]:
+    """
+    Bỏ các nước trao cho đối thủ nước thắng ngay (và mọi nước khác khi có nước
+    thắng ngay hoặc một ô bắt buộc phải chặn); giữ nguyên nếu mọi nước đều thua.
+    """
+    safe = safe_moves_mask(board, own_win, opp_win)
+    if not safe:
+        return moves
+    height = board.height
+    heights = board.heights
+    pruned = [c for c in moves if safe >> (c * height + heights[c]) & 1]
+    return pruned or moves
+
+
+@lru_cache(maxsize=None)
+def _batch_evaluator(rows: int, cols: int) -> BatchEvaluator:
+    """BatchEvaluator dùng chung cho mỗi kích thước bảng, cùng trọng số với `_score_position`."""
+    return BatchEvaluator(rows, cols, _WINDOW_SCORES)
+
+
+class SearchTimeout(Exception):
+    """Ném ra bên trong cây tìm kiếm khi hết thời gian cho phép."""
+
+
+# Số node giữa hai lần đọc đồng hồ (lũy thừa của 2 trừ 1)
+_CLOCK_CHECK_MASK = 255
+
+# Các biến thể tìm kiếm: alpha-beta thường hoặc principal variation search
+VARIANTS = ("alphabeta", "pvs")
+# Nửa độ rộng cửa sổ aspiration quanh giá trị của vòng lặp trước (biến thể "pvs")
+ASPIRATION_WINDOW = 25
+
+
+class _BitboardSearch:
+    """
+    Negamax alpha-beta chạy tại chỗ trên một BitBoard (đi/hoàn tác, không sao chép).
+    Điểm nút lá được đọc từ IncrementalEvaluator, cập nhật cùng mỗi nước đi.
+    Nếu có bảng chuyển vị, mỗi nút trong (depth > 0) được tra trước khi duyệt.
+    Thứ tự nước đi do MoveOrderer quyết định: thắng ngay, chặn, PV của vòng lặp
+    sâu dần trước, nước trong bảng, killer rồi history.
+    Với `batch_leaves`, các lá của ply cuối dưới cùng một nút được chấm điểm
+    trong một lần gọi BatchEvaluator thay vì đi từng nước.
+    Biến thể "pvs": nước đầu tiên được tìm với cửa sổ đầy đủ, các nước sau bằng
+    cửa sổ rỗng (alpha, alpha + 1) và chỉ tìm lại khi vượt alpha; khi tìm sâu dần,
+    gốc dùng cửa sổ aspiration quanh giá trị của vòng trước.
+    Khi số cột lẻ, hàm đánh giá đối xứng qua cột giữa nên thế cờ và ảnh gương
+    của nó dùng chung một ô bảng (khóa `canonical_hash`, nước đi được lật theo).
+    `stop`: Event do luồng khác đặt để ngắt tìm kiếm giống như khi hết giờ.
+    `reset_orderer=False`: không gọi `orderer.new_search` (nơi gọi đã gọi một lần
+    cho cả loạt tìm kiếm dùng chung MoveOrderer).
+    """
+
+    def __init__(
+        self,
+        board: BitBoard,
+        table: Optional[TranspositionTable] = None,
+        orderer: Optional[MoveOrderer] = None,
+        batch_leaves: bool = False,
+        variant: str = "alphabeta",
+        stop: Optional[threading.Event] = None,
+        reset_orderer: bool = True,
+    ):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown search variant {variant!r}, expected one of {VARIANTS}")
+        self.board = board
+        self.pvs = variant == "pvs"
+        self.table = table
+        # Với số cột chẵn, cột được cộng điểm trung tâm (cols // 2) không có cột đối xứng
+        # cùng điểm nên hai ảnh gương có giá trị heuristic khác nhau
+        self.mirror_keys = board.cols % 2 == 1
+        self.orderer = orderer if orderer is not None else MoveOrderer()
+        if reset_orderer:
+            self.orderer.new_search(board)
+        self.evaluator = IncrementalEvaluator.from_board(board, _WINDOW_SCORES)
+        self.batch = _batch_evaluator(board.rows, board.cols) if batch_leaves else None
+        # Bộ đếm cho SearchStats
+        self.nodes = 0
+        self.leaves = 0
+        self.expanded = 0
+        self.cutoffs = [0] * (board.rows * board.cols + 2)
+        self.first_move_cutoffs = 0
+        self.tt_cutoffs = 0
+        self.researches = 0
+        self.deadline: Optional[float] = None
+        # Được đặt từ luồng khác để dừng tìm kiếm (cùng cách kiểm tra như `deadline`)
+        self.stop = stop
+        self.root_ply = len(board.moves)
+        # Số quân của thế cờ hiện tại = stone_base + len(board.moves), ghi cùng mỗi ô bảng
+        self.stone_base = board.mask.bit_count() - self.root_ply
+        center = board.cols // 2
+        self.order = sorted(range(board.cols), key=lambda c: abs(center - c))
+        self.iteration_depth = 0
+        self.pv: List[int] = []
+        self.pv_lines: List[Tuple[int, ...]] = [()]
+        self.follow_pv = False
+
+    def negamax(self, depth: int, alpha: float, beta: float) -> float:
+        """Giá trị thế cờ theo góc nhìn bên sắp đi (cùng quy ước điểm với `_minimax`)."""
+        self.nodes += 1
+        if not self.nodes & _CLOCK_CHECK_MASK and (
+            (self.deadline is not None and time.perf_counter() > self.deadline)
+            or (self.stop is not None and self.stop.is_set())
+        ):
+            raise SearchTimeout()
+        board = self.board
+        piece = board.to_move
+        evaluator = self.evaluator
+        if depth == 0:
+            self.leaves += 1
+            return evaluator.scores[piece]
+
+        heights = board.heights
+        rows = board.rows
+        moves = [c for c in self.order if heights[c] < rows]
+        if not moves:
+            self.leaves += 1
+            return evaluator.scores[piece]
+
+        table = self.table
+        alpha_orig = alpha
+        hash_move = None
+        if table is not None:
+            key, mirrored = board.canonical_hash() if self.mirror_keys else (board.hash, False)
+            entry = table.probe(key)
+            if entry is not None:
+                entry_depth, flag, entry_value, entry_move = entry
+                if entry_depth >= depth:
+                    if flag == EXACT:
+                        self.tt_cutoffs += 1
+                        return entry_value
+                    if flag == LOWER:
+                        alpha = max(alpha, entry_value)
+                    else:
+                        beta = min(beta, entry_value)
+                    if alpha >= beta:
+                        self.tt_cutoffs += 1
+                        return entry_value
+                if entry_move != NO_MOVE:
+                    hash_move = board.orient(entry_move, mirrored)
+
+        ply = self.iteration_depth - depth
+        if depth > 1:
+            # Nút lá ngay dưới không cần: chi phí tính ô thắng lớn hơn phần tiết kiệm
+            own_win = board.winning_cells(piece)
+            opp_win = board.winning_cells(3 - piece)
+            moves = _prune_losing(board, moves, own_win, opp_win)
+        pv_move = self._pv_move(moves, ply) if self.follow_pv else None
+        if depth > 1:
+            moves = self.orderer.order(board, moves, ply, pv_move, hash_move, own_win, opp_win)
+        else:
+            # Con của nút này đều là lá: sắp xếp đầy đủ tốn hơn phần tiết kiệm được
+            for col in (hash_move, pv_move):
+                if col is not None and col in moves:
+                    moves.remove(col)
+                    moves.insert(0, col)
+
+        self.expanded += 1
+        if depth == 1 and self.batch is not None:
+            value, best_col = self._last_ply(moves, ply, alpha, beta)
+            moves = ()
+        else:
+            value = -math.inf
+            best_col = None
+
+        pv_lines = self.pv_lines
+        for move_number, col in enumerate(moves):
+            index = board.play(col)
+            evaluator.add(index, piece)
+            pv_lines[ply + 1] = ()
+            if board.is_winner(piece):
+                new_value = WIN_SCORE
+            else:
+                new_value = self._child_value(depth - 1, alpha, beta, move_number)
+            board.undo()
+            evaluator.remove(index, piece)
+
+            if new_value > value:
+                value = new_value
+                best_col = col
+            if value > alpha:
+                alpha = value
+                pv_lines[ply] = (col,) + pv_lines[ply + 1]
+            if alpha >= beta:
+                self.cutoffs[ply] += 1
+                if move_number == 0:
+                    self.first_move_cutoffs += 1
+                self.orderer.record_cutoff(board, col, ply, depth, move_number)
+                break
+            if value >= WIN_SCORE:
+                break
+
+        if table is not None:
+            if value <= alpha_orig:
+                flag = UPPER
+            elif value >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            table.store(key, depth, flag, value, board.orient(best_col, mirrored), self.stone_base + len(board.moves))
+        return value
+
+    def _child_value(self, depth: int, alpha: float, beta: float, move_number: int) -> float:
+        """Giá trị nước vừa đi, theo góc nhìn bên vừa đi; PVS thử cửa sổ rỗng trước với các nước sau nước đầu."""
+        if self.pvs and move_number and beta - alpha > 1:
+            value = -self.negamax(depth, -alpha - 1, -alpha)
+            if not alpha < value < beta:
+                return value
+            self.researches += 1
+        return -self.negamax(depth, -beta, -alpha)
+
+    def _last_ply(self, moves: List[int], ply: int, alpha: float, beta: float) -> Tuple[float, Optional[int]]:
+        """
+        Vòng lặp nước đi của nút có độ sâu còn lại 1, nhưng điểm mọi lá được tính
+        sẵn trong một lần gọi `score_bitboards`; cho cùng giá trị và cùng thứ tự cắt tỉa.
+        """
+        board = self.board
+        piece = board.to_move
+        height = board.height
+        heights = board.heights
+        wins = board.winning_cells(piece)
+        bits = [1 << (col * height + heights[col]) for col in moves]
+        own = board.pieces[piece]
+        # Lá được đánh giá theo góc nhìn bên đi tiếp, tức đối thủ
+        leaf_scores = self.batch.score_bitboards(
+            np.full(len(bits), board.pieces[3 - piece], dtype=np.uint64),
+            np.array([own | bit for bit in bits], dtype=np.uint64),
+        ).tolist()
+
+        pv_lines = self.pv_lines
+        value = -math.inf
+        best_col = None
+        for move_number, col in enumerate(moves):
+            if wins & bits[move_number]:
+                new_value = WIN_SCORE
+            else:
+                self.nodes += 1
+                self.leaves += 1
+                new_value = -leaf_scores[move_number]
+            if new_value > value:
+                value = new_value
+                best_col = col
+            if value > alpha:
+                alpha = value
+                pv_lines[ply] = (col,)
+            if alpha >= beta:
+                self.cutoffs[ply] += 1
+                if move_number == 0:
+                    self.first_move_cutoffs += 1
+                self.orderer.record_cutoff(board, col, ply, 1, move_number)
+                break
+            if value >= WIN_SCORE:
+                break
+        return value, best_col
+
+    def _pv_move(self, moves: List[int], ply: int) -> Optional[int]:
+        """Nước PV của vòng trước tại độ sâu `ply` (nếu còn đi được); tắt theo PV khi đã lệch."""
+        self.follow_pv = False
+        if ply < len(self.pv) and self.pv[ply] in moves:
+            self.follow_pv = True
+            return self.pv[ply]
+        return None
+
+    def root_order(self, root_moves: Sequence[int]) -> List[int]:
+        """
+        Các nước ở gốc theo đúng thứ tự `search_root` duyệt: bỏ các nước thua ngay
+        (`_prune_losing`), rồi xếp theo nước PV, nước trong bảng chuyển vị và history.
+        """
+        board = self.board
+        moves = _prune_losing(board, [c for c in self.order if c in root_moves and board.can_play(c)])
+        hash_move = None
+        if self.table is not None:
+            key, mirrored = board.canonical_hash() if self.mirror_keys else (board.hash, False)
+            entry = self.table.probe(key)
+            if entry is not None and entry[3] != NO_MOVE:
+                hash_move = board.orient(entry[3], mirrored)
+        self.follow_pv = bool(self.pv)
+        pv_move = self._pv_move(moves, 0) if self.follow_pv else None
+        return self.orderer.order(board, moves, 0, pv_move, hash_move)
+
+    def search_root(
+        self, depth: int, root_moves: Sequence[int], alpha: float = -math.inf, beta: float = math.inf
+    ) -> Tuple[Optional[int], float]:
+        """
+        Duyệt các nước ở gốc theo thứ tự ưu tiên cột giữa, trả về (cột tốt nhất, giá trị).
+        Với cửa sổ (alpha, beta) hẹp, giá trị ngoài cửa sổ chỉ là cận và cột không đáng tin.
+        """
+        board = self.board
+        piece = board.to_move
+        alpha_orig = alpha
+        best_col: Optional[int] = None
+        value = -math.inf
+        self.iteration_depth = depth
+        self.pv_lines = [()] * (depth + 2)
+        moves = self.root_order(root_moves)
+
+        pv_lines = self.pv_lines
+        evaluator = self.evaluator
+        self.expanded += 1
+        for move_number, col in enumerate(moves):
+            self.nodes += 1
+            index = board.play(col)
+            evaluator.add(index, piece)
+            pv_lines[1] = ()
+            if board.is_winner(piece):
+                new_value = WIN_SCORE
+            else:
+                new_value = self._child_value(depth - 1, alpha, beta, move_number)
+            board.undo()
+            evaluator.remove(index, piece)
+
+            if new_value > value:
+                value = new_value
+                best_col = col
+            if value > alpha:
+                alpha = value
+                pv_lines[0] = (col,) + pv_lines[1]
+            if alpha >= beta:
+                self.cutoffs[0] += 1
+                if move_number == 0:
+                    self.first_move_cutoffs += 1
+                self.orderer.record_cutoff(board, col, 0, depth, move_number)
+                break
+        if self.table is not None and best_col is not None:
+            key, mirrored = board.canonical_hash() if self.mirror_keys else (board.hash, False)
+            if value <= alpha_orig:
+                flag = UPPER
+            elif value >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.table.store(key, depth, flag, value, board.orient(best_col, mirrored), self.stone_base + len(board.moves))
+        return best_col, value
+
+    def _aspiration_root(self, depth: int, root_moves: Sequence[int], guess: float) -> Tuple[Optional[int], float]:
+        """Tìm ở gốc với cửa sổ hẹp quanh `guess`; nếu trượt ra ngoài thì mở rộng phía đó ra vô cùng rồi tìm lại."""
+        alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+        while True:
+            col, value = self.search_root(depth, root_moves, alpha, beta)
+            if value <= alpha:
+                alpha = -math.inf
+            elif value >= beta:
+                beta = math.inf
+            else:
+                return col, value
+            self.researches += 1
+
+    def search_value(self, depth: int, alpha: float = -math.inf, beta: float = math.inf) -> float:
+        """Giá trị negamax của thế cờ hiện tại ở độ sâu `depth`, không chọn nước ở gốc."""
+        self.iteration_depth = depth
+        self.pv_lines = [()] * (depth + 2)
+        self.follow_pv = False
+        return self.negamax(depth, alpha, beta)
+
+    def iterative_deepening(
+        self, max_depth: int, root_moves: Sequence[int], deadline: float
+    ) -> Tuple[Optional[int], float, int]:
+        """
+        Tìm kiếm sâu dần 1, 2, ... cho tới `max_depth` hoặc tới `deadline`
+        (giá trị của time.perf_counter). Vòng bị cắt ngang vì hết giờ bị bỏ;
+        trả về (cột, giá trị, độ sâu) của vòng hoàn tất gần nhất.
+        Vòng độ sâu 1 không bị giới hạn giờ để chắc chắn có nước đi (chỉ `stop` mới ngắt được).
+        """
+        best_col: Optional[int] = None
+        best_value = -math.inf
+        completed = 0
+        self.pv = []
+        for depth in range(1, max_depth + 1):
+            self.deadline = deadline if depth > 1 else None
+            try:
+                col, value = self.deepen(depth, root_moves, best_value if completed else None)
+            except SearchTimeout:
+                break
+            best_col, best_value, completed = col, value, depth
+            if abs(value) >= WIN_SCORE or time.perf_counter() > deadline:
+                break
+        self.deadline = None
+        return best_col, best_value, completed
+
+    def deepen(self, depth: int, root_moves: Sequence[int], guess: Optional[float] = None) -> Tuple[Optional[int], float]:
+        """
+        Một vòng của tìm sâu dần: tìm ở gốc theo PV của vòng trước (biến thể "pvs"
+        dùng cửa sổ aspiration quanh `guess`, giá trị vòng trước) rồi lưu PV mới.
+        Ném SearchTimeout nếu bị ngắt; bảng luôn được khôi phục về gốc.
+        """
+        try:
+            if self.pvs and guess is not None and abs(guess) < WIN_SCORE:
+                col, value = self._aspiration_root(depth, root_moves, guess)
+            else:
+                col, value = self.search_root(depth, root_moves)
+        finally:
+            # Bị ngắt giữa chừng thì bảng đang dở; khôi phục từ dãy nước ở gốc
+            self._restore_root()
+        self.pv = list(self.pv_lines[0])
+        return col, value
+
+    def _restore_root(self) -> None:
+        """Hoàn tác các nước còn sót lại khi tìm kiếm bị ngắt bởi ngoại lệ."""
+        board = self.board
+        while len(board.moves) > self.root_ply:
+            col = board.undo()
+            self.evaluator.remove(board.bit_index(col, board.heights[col]), board.to_move)
+
+
 def choose_best_action(
-    state: BoardState, piece: int, depth: int, allowed_actions: Sequence[int]
-) -> Optional[int]:
+    state: BoardState,
+    piece: int,
+    depth: Optional[int],
+    allowed_actions: Sequence[int],
+    table: Optional[TranspositionTable] = None,
+    time_ms: Optional[float] = None,
+    orderer: Optional[MoveOrderer] = None,
+    solver: Optional["Solver"] = None,
+    solve_ms: Optional[float] = None,
+    batch_leaves: bool = False,
+    cache: Optional["SolvedCache"] = None,
+    variant: str = "alphabeta",
+    return_stats: bool = False,
+    trace: Optional[JsonLinesTrace] = None,
+    stop: Optional[threading.Event] = None,
+) -> Union[Optional[int], Tuple[Optional[int], SearchStats]]:
     """
     Chọn cột tốt nhất dùng bởi Player.
-    Trả về cột tốt nhất để đi, hoặc None nếu không còn nước đi hợp lệ.
+    Bảng chỉ được chuyển sang bitboard một lần ở gốc; toàn bộ cây tìm kiếm
+    đi/hoàn tác nước trên cùng một BitBoard.
+    `table`: bảng chuyển vị giữ lại giữa các lần gọi trong một ván (tùy chọn).
+    `time_ms`: nếu có, tìm kiếm sâu dần tới khi hết thời gian; khi đó `depth`
+    là độ sâu tối đa (None = số ô còn trống).
+    `orderer`: bộ sắp xếp nước đi giữ history giữa các lần gọi (mặc định: một
+    MoveOrderer mới cho mỗi lần gọi).
+    `solver`: bộ giải chính xác (`Minimax.solver.Solver`); nếu có, thử giải
+    trọn thế cờ trong `solve_ms` (None = không giới hạn) trước, và chỉ tìm
+    heuristic như trên khi giải không kịp (`time_ms` tính từ lúc đó).
+    `batch_leaves`: chấm điểm lá của ply cuối theo lô bằng NumPy (cùng kết quả).
+    `cache`: kho thế cờ đã giải trên đĩa (`Minimax.solved_cache.SolvedCache`);
+    thế cờ có trong kho được trả lời ngay, và kết quả của `solver` được ghi vào.
+    `variant`: "alphabeta" (mặc định) hoặc "pvs" (principal variation search,
+    thêm cửa sổ aspiration ở gốc khi có `time_ms`); cùng giá trị, khác số node.
+    `trace`: nếu có, số liệu của lần gọi được ghi thành một dòng JSON.
+    `stop`: Event do luồng khác (ví dụ giao diện) đặt để hủy lượt tìm; bộ giải và
+    tìm kiếm dừng trong vòng vài trăm node và trả về nước của vòng tìm sâu dần
+    hoàn tất gần nhất, hoặc None nếu chưa có.
+    Trả về cột tốt nhất để đi, hoặc None nếu không còn nước đi hợp lệ;
+    với `return_stats`, trả về (cột, SearchStats).
     """
-    board = _copy_board(state)
+    stats = SearchStats()
+    start = time.perf_counter()
+    stats.move = _choose_best_action(
+        state, piece, depth, allowed_actions, table, time_ms, orderer,
+        solver, solve_ms, batch_leaves, cache, variant, stats, stop,
+    )
+    stats.elapsed = time.perf_counter() - start
+    if trace is not None:
+        trace.write(stats, piece=piece, moves_played=sum(1 for row in state for value in row if value != 0))
+    return (stats.move, stats) if return_stats else stats.move
+
 
+def _choose_best_action(
+    state: BoardState,
+    piece: int,
+    depth: Optional[int],
+    allowed_actions: Sequence[int],
+    table: Optional[TranspositionTable],
+    time_ms: Optional[float],
+    orderer: Optional[MoveOrderer],
+    solver: Optional["Solver"],
+    solve_ms: Optional[float],
+    batch_leaves: bool,
+    cache: Optional["SolvedCache"],
+    variant: str,
+    stats: SearchStats,
+    stop: Optional[threading.Event],
+) -> Optional[int]:
+    """Thân của `choose_best_action`; ghi số liệu vào `stats`."""
     if not allowed_actions:
         return None
-        
-    best_col, _ = _minimax(board, depth, -math.inf, math.inf, True, piece)
-    
-    return best_col
 
+    start = time.perf_counter()
+    board = BitBoard.from_state(state, piece)
+    if board.is_winner(1) or board.is_winner(2):
+        return None
+
+    if cache is not None:
+        entry = cache.probe(board)
+        if entry is not None and entry[0] != NO_MOVE and entry[0] in allowed_actions and board.can_play(entry[0]):
+            stats.source = "cache"
+            stats.value = entry[1]
+            return entry[0]
+
+    if solver is not None:
+        deadline = None if solve_ms is None else start + solve_ms / 1000.0
+        try:
+            best_col, result = solver.best_move(board, allowed_actions, deadline, cache, stop)
+            stats.source = "solver"
+            stats.solver_nodes = solver.nodes
+            if result is not None:
+                stats.value = result.score
+            return best_col
+        except SearchTimeout:
+            stats.solver_nodes = solver.nodes
+            if stop is not None and stop.is_set():
+                return None
+            start = time.perf_counter()
+
+    if table is not None:
+        table.new_search(board.mask.bit_count())
+    search = _BitboardSearch(board, table, orderer, batch_leaves, variant, stop)
+    empty_cells = board.rows * board.cols - board.mask.bit_count()
+    if time_ms is None:
+        stats.depth = max(depth or 1, 1)
+        try:
+            best_col, stats.value = search.search_root(stats.depth, allowed_actions)
+        except SearchTimeout:
+            # Chỉ xảy ra khi `stop` được đặt: độ sâu cố định không có vòng nào để lùi về
+            best_col, stats.depth = None, 0
+    else:
+        max_depth = min(depth, empty_cells) if depth else empty_cells
+        best_col, stats.value, stats.depth = search.iterative_deepening(
+            max(max_depth, 1), allowed_actions, start + time_ms / 1000.0
+        )
+
+    stats.nodes = search.nodes
+    stats.leaves = search.leaves
+    stats.expanded = search.expanded
+    stats.cutoffs = search.cutoffs[: stats.depth + 1]
+    stats.first_move_cutoffs = search.first_move_cutoffs
+    stats.tt_cutoffs = search.tt_cutoffs
+    stats.researches = search.researches
+    return best_col
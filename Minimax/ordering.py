@@ -0,0 +1,102 @@
+from typing import List, Optional
+
+from Minimax.bitboard import BitBoard
+
+# Mức ưu tiên; nước thường được xếp theo điểm history (luôn nhỏ hơn các mức này)
+_WIN = 1 << 40
+_BLOCK = 1 << 39
+_PV = 1 << 38
+_HASH = 1 << 37
+_KILLER = 1 << 36
+
+
+class MoveOrderer:
+    """
+    Sắp xếp nước đi cho alpha-beta theo thứ tự:
+    thắng ngay > chặn thắng ngay của đối thủ > nước PV > nước trong bảng chuyển vị
+    > killer move của cùng độ sâu > điểm history heuristic > gần cột giữa.
+
+    Đồng thời đếm số lần cắt tỉa và số lần cắt ngay ở nước đầu tiên để đo
+    chất lượng sắp xếp (`first_move_cutoff_rate`).
+    """
+
+    KILLERS_PER_PLY = 2
+
+    def __init__(self) -> None:
+        self.killers: List[List[int]] = []
+        # history[piece][bit index]: thưởng cho nước gây cắt tỉa, theo depth^2
+        self.history: List[List[int]] = [[], [], []]
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self, board: BitBoard) -> None:
+        """Xóa killer (độ sâu tính từ gốc đã đổi) và giảm nửa history giữa hai lần tìm kiếm."""
+        size = board.cols * board.height
+        if len(self.history[1]) != size:
+            self.history = [[], [0] * size, [0] * size]
+        else:
+            for piece in (1, 2):
+                self.history[piece] = [h >> 1 for h in self.history[piece]]
+        self.killers = [[] for _ in range(board.rows * board.cols + 1)]
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def order(
+        self,
+        board: BitBoard,
+        moves: List[int],
+        ply: int,
+        pv_move: Optional[int] = None,
+        hash_move: Optional[int] = None,
+        own_win: Optional[int] = None,
+        opp_win: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Trả về danh sách `moves` đã sắp xếp (giữ thứ tự gốc giữa các nước ngang hạng).
+        `own_win`, `opp_win`: `winning_cells` của hai bên nếu nơi gọi đã tính.
+        """
+        piece = board.to_move
+        playable = board.playable_mask()
+        if own_win is None:
+            own_win = board.winning_cells(piece)
+        if opp_win is None:
+            opp_win = board.winning_cells(3 - piece)
+        wins = own_win & playable
+        blocks = opp_win & playable
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history[piece]
+        height = board.height
+        heights = board.heights
+
+        def priority(col: int) -> int:
+            index = col * height + heights[col]
+            if wins >> index & 1:
+                return _WIN
+            if blocks >> index & 1:
+                return _BLOCK
+            if col == pv_move:
+                return _PV
+            if col == hash_move:
+                return _HASH
+            if col in killers:
+                return _KILLER + (self.KILLERS_PER_PLY - killers.index(col))
+            return history[index]
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def record_cutoff(self, board: BitBoard, col: int, ply: int, depth: int, move_number: int) -> None:
+        """Ghi nhận nước `col` (thứ `move_number` được thử, tính từ 0) gây cắt tỉa ở `ply`."""
+        self.cutoffs += 1
+        if move_number == 0:
+            self.first_move_cutoffs += 1
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if col not in killers:
+                killers.insert(0, col)
+                del killers[self.KILLERS_PER_PLY:]
+        index = col * board.height + board.heights[col]
+        self.history[board.to_move][index] += depth * depth
+
+    def first_move_cutoff_rate(self) -> float:
+        """Tỉ lệ cắt tỉa xảy ra ngay ở nước đầu tiên (càng gần 1 càng tốt)."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
@@ -0,0 +1,233 @@
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Minimax.bitboard import BitBoard
+from Minimax.minimax import VARIANTS, WIN_SCORE, BoardState, SearchTimeout, _BitboardSearch
+from Minimax.ordering import MoveOrderer
+from Minimax.transposition import TranspositionTable
+
+# Bảng chuyển vị và bộ sắp xếp riêng của mỗi tiến trình con, sống cùng tiến trình
+_worker_table: Optional[TranspositionTable] = None
+_worker_orderer: Optional[MoveOrderer] = None
+# Event dùng chung với tiến trình cha, đặt khi lượt tìm bị hủy hoặc hết giờ
+_worker_stop = None
+
+# Thời gian (giây) giữa hai lần tiến trình cha kiểm tra `stop` khi chờ các việc
+_STOP_POLL = 0.05
+
+
+def _init_worker(table_size_mb: float, stop) -> None:
+    """Khởi tạo một lần cho mỗi tiến trình con của pool."""
+    global _worker_table, _worker_orderer, _worker_stop
+    _worker_table = TranspositionTable(table_size_mb)
+    _worker_orderer = MoveOrderer()
+    _worker_stop = stop
+
+
+def _search_line(
+    state: BoardState,
+    piece: int,
+    line: Tuple[int, ...],
+    depth: int,
+    time_left: Optional[float],
+    variant: str = "alphabeta",
+) -> Optional[float]:
+    """
+    Chạy trong tiến trình con: đi dãy nước `line` từ thế cờ gốc rồi tìm tiếp
+    `depth - len(line)` ply. Trả về giá trị theo góc nhìn của bên đi nước cuối
+    trong `line`, hoặc None nếu hết `time_left` giây hoặc tiến trình cha hủy lượt tìm.
+    """
+    board = BitBoard.from_state(state, piece)
+    # Gốc của cả lượt tìm là thế cờ trước `line`: ô của các việc khác cùng lượt vẫn còn dùng được
+    root_stones = board.mask.bit_count()
+    for col in line:
+        mover = board.to_move
+        board.play(col)
+        if board.is_winner(mover):
+            return WIN_SCORE
+    table = _worker_table
+    if table is not None:
+        table.new_search(root_stones)
+    search = _BitboardSearch(board, table, _worker_orderer, variant=variant, stop=_worker_stop)
+    if time_left is not None:
+        search.deadline = time.perf_counter() + time_left
+    try:
+        return -search.search_value(depth - len(line))
+    except SearchTimeout:
+        return None
+
+
+class ParallelSearch:
+    """
+    Tìm kiếm song song ở gốc trên một process pool dùng lại giữa các nước đi.
+
+    Mỗi nước ở gốc (hoặc mỗi cặp nước gốc + nước đáp khi số tiến trình nhiều
+    hơn số nước ở gốc) được tìm với cửa sổ đầy đủ trong một tiến trình con nên
+    cho giá trị chính xác. Các nước ở gốc được lọc và sắp xếp như
+    `_BitboardSearch.search_root` làm với bảng chuyển vị và MoveOrderer của người
+    gọi (bỏ nước thua ngay, rồi nước trong bảng, history), và nước được chọn là
+    nước đầu tiên đạt giá trị lớn nhất theo thứ tự đó, như lượt tìm tuần tự.
+    Hai bên vẫn có thể chọn khác nhau giữa các nước cùng giá trị, vì history mà
+    lượt tìm tuần tự tích lũy qua các nước không có ở đây (các tiến trình con dùng
+    MoveOrderer riêng), và giá trị có thể khác khi bảng của lượt tìm tuần tự còn ô
+    tìm sâu hơn từ các nước trước. Không có `SearchStats` hay trace cho lượt tìm này.
+    """
+
+    def __init__(self, workers: Optional[int] = None, table_size_mb: float = 16, variant: str = "alphabeta"):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown search variant {variant!r}, expected one of {VARIANTS}")
+        self.workers = workers or os.cpu_count() or 1
+        self.table_size_mb = table_size_mb
+        self.variant = variant
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stop = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """Tạo pool ở lần dùng đầu tiên; "spawn" để tiến trình con không kế thừa pygame/TensorFlow."""
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            self._stop = context.Event()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.table_size_mb, self._stop),
+            )
+        return self._pool
+
+    def close(self) -> None:
+        """Dừng các tiến trình con."""
+        if self._pool is not None:
+            self._stop.set()
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._stop = None
+
+    def _split(self, board: BitBoard, root_moves: List[int], depth: int) -> List[Tuple[int, ...]]:
+        """Chia việc: mỗi nước gốc một việc, hoặc tách thêm một ply khi thiếu việc cho các tiến trình."""
+        if len(root_moves) >= self.workers or depth < 2:
+            return [(col,) for col in root_moves]
+        lines = []
+        for col in root_moves:
+            board.play(col)
+            replies = board.playable_columns()
+            board.undo()
+            if replies:
+                lines.extend((col, reply) for reply in replies)
+            else:
+                lines.append((col,))
+        return lines
+
+    def _run_iteration(
+        self,
+        state: BoardState,
+        piece: int,
+        board: BitBoard,
+        root_moves: List[int],
+        depth: int,
+        deadline: Optional[float],
+        stop: Optional[threading.Event] = None,
+    ) -> Optional[Tuple[int, float]]:
+        """Một lượt tìm ở độ sâu `depth`; None nếu có việc bị hết giờ hoặc `stop` được đặt."""
+        lines = self._split(board, root_moves, depth)
+        pool = self._executor()
+        self._stop.clear()
+        time_left = None if deadline is None else deadline - time.perf_counter()
+        futures = [pool.submit(_search_line, state, piece, line, depth, time_left, self.variant) for line in lines]
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=_STOP_POLL, return_when=FIRST_COMPLETED)
+            if (stop is not None and stop.is_set()) or any(future.result() is None for future in done):
+                # Bỏ các việc chưa chạy và dừng các việc đang chạy, rồi chờ chúng trả về
+                # để lượt sau không phải chờ sau các việc cũ
+                for future in pending:
+                    future.cancel()
+                self._stop.set()
+                wait(pending)
+                return None
+
+        # Giá trị theo góc nhìn đối thủ sau mỗi nước gốc: lấy max trên các nước đáp
+        reply_best: Dict[int, float] = {}
+        root_values: Dict[int, float] = {}
+        for line, future in zip(lines, futures):
+            value = future.result()
+            if len(line) == 1:
+                root_values[line[0]] = value
+            else:
+                reply_best[line[0]] = max(reply_best.get(line[0], -math.inf), value)
+        for col, value in reply_best.items():
+            root_values[col] = -value
+
+        best_col = root_moves[0]
+        for col in root_moves:
+            if root_values[col] > root_values[best_col]:
+                best_col = col
+        return best_col, root_values[best_col]
+
+    def choose_best_action(
+        self,
+        state: BoardState,
+        piece: int,
+        depth: Optional[int],
+        allowed_actions: Sequence[int],
+        time_ms: Optional[float] = None,
+        table: Optional[TranspositionTable] = None,
+        orderer: Optional[MoveOrderer] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Optional[int]:
+        """
+        Cùng hợp đồng với `Minimax.minimax.choose_best_action`, nhưng các cây con
+        được tìm song song. Với `time_ms`, tìm sâu dần và giữ kết quả của lượt
+        hoàn tất cuối cùng. `table` và `orderer` của người gọi chỉ dùng để sắp xếp
+        các nước ở gốc (`orderer.new_search` được gọi như ở lượt tìm tuần tự).
+        `stop`: Event để hủy lượt tìm; các tiến trình con dừng trong vòng vài trăm
+        node và nước của lượt hoàn tất gần nhất được trả về, hoặc None nếu chưa có.
+        """
+        if not allowed_actions:
+            return None
+        start = time.perf_counter()
+        board = BitBoard.from_state(state, piece)
+        if board.is_winner(1) or board.is_winner(2):
+            return None
+
+        root_moves = _BitboardSearch(board, table, orderer).root_order(allowed_actions)
+        if not root_moves:
+            return None
+        for col in root_moves:
+            board.play(col)
+            won = board.is_winner(piece)
+            board.undo()
+            if won:
+                return col
+
+        empty_cells = board.rows * board.cols - board.mask.bit_count()
+        if time_ms is None:
+            result = self._run_iteration(
+                state, piece, board, root_moves, max(min(depth or 1, empty_cells), 1), None, stop
+            )
+            if result is None:
+                return None if stop is not None and stop.is_set() else root_moves[0]
+            return result[0]
+
+        deadline = start + time_ms / 1000.0
+        max_depth = min(depth, empty_cells) if depth else empty_cells
+        best_col = None
+        for iteration_depth in range(1, max(max_depth, 1) + 1):
+            result = self._run_iteration(
+                state, piece, board, root_moves, iteration_depth, deadline if iteration_depth > 1 else None, stop
+            )
+            if result is None:
+                break
+            best_col, value = result
+            # Nước tốt nhất của lượt trước được tìm trước ở lượt sau
+            root_moves.remove(best_col)
+            root_moves.insert(0, best_col)
+            if abs(value) >= WIN_SCORE or time.perf_counter() > deadline:
+                break
+        return best_col
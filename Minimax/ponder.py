@@ -0,0 +1,133 @@
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from Minimax.bitboard import BitBoard
+from Minimax.minimax import WIN_SCORE, SearchTimeout, _BitboardSearch
+from Minimax.ordering import MoveOrderer
+from Minimax.transposition import TranspositionTable
+
+# Độ sâu của lượt tìm nông từ góc nhìn đối thủ để đoán nước trả lời
+PREDICT_DEPTH = 4
+# Số ply nước trả lời được đoán đi trước các nước trả lời khác trong mỗi vòng
+PREDICTED_LEAD = 2
+
+
+class Ponderer:
+    """
+    Tìm kiếm nền trong lượt của đối thủ, trên một luồng riêng dùng chung bảng
+    chuyển vị của người chơi (chỉ một bên dùng tại một thời điểm: `stop` chờ
+    luồng dừng hẳn rồi mới trả về). MoveOrderer là của riêng Ponderer, để
+    history mà người chơi mang qua các nước không bị giảm nửa theo mỗi dòng tìm
+    nền; nó được `new_search` một lần mỗi lần `start`.
+
+    `start(board)` nhận thế cờ ngay sau nước của mình: một lượt tìm nông từ góc
+    nhìn đối thủ đoán nước trả lời, rồi mọi thế cờ sau nước trả lời được tìm sâu
+    dần xen kẽ theo vòng (vòng d: nước đoán ở độ sâu d, các nước khác ở độ sâu
+    d - PREDICTED_LEAD) tới `max_depth` hoặc cho tới khi `stop`; luồng tự kết thúc
+    khi mọi dòng đạt `max_depth`, nên không có giới hạn này nó chạy tới khi bàn
+    đầy hoặc tới lần `stop` kế tiếp. Kết quả hoàn tất sâu nhất của mỗi thế cờ được giữ lại để `result` trả về khi nước thật tới;
+    các ô bảng đã ghi giúp lượt tìm thật đi sâu hơn trong cùng thời gian.
+    """
+
+    def __init__(
+        self,
+        table: TranspositionTable,
+        max_depth: Optional[int] = None,
+        variant: str = "alphabeta",
+    ):
+        self.table = table
+        self.orderer = MoveOrderer()
+        self.max_depth = max_depth
+        self.variant = variant
+        # BitBoard.key() của thế cờ sau nước trả lời -> (cột, giá trị, độ sâu)
+        self.results: Dict[int, Tuple[int, float, int]] = {}
+        self.predicted: Optional[int] = None
+        self.nodes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, board: BitBoard, max_depth: Optional[int] = None) -> None:
+        """
+        Bắt đầu tìm nền từ thế cờ `board` (đối thủ sắp đi); luồng nhận quyền sở hữu
+        `board`. `max_depth`, nếu có, thay giới hạn độ sâu đặt lúc khởi tạo.
+        """
+        self.stop()
+        if max_depth is not None:
+            self.max_depth = max_depth
+        self.results = {}
+        self.predicted = None
+        self.nodes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(board, self._stop), name="ponder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Dừng tìm nền và chờ luồng kết thúc (trong vòng vài trăm node)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def result(self, board: BitBoard) -> Optional[Tuple[int, float, int]]:
+        """(cột, giá trị, độ sâu) đã tìm xong cho thế cờ `board`, hoặc None."""
+        return self.results.get(board.key())
+
+    def _run(self, board: BitBoard, stop: threading.Event) -> None:
+        replies = self._predict(board, stop)
+        # Các dòng có gốc cùng độ sâu nên dùng chung killer theo ply; history chỉ giảm một lần
+        self.orderer.new_search(board)
+        empty = board.rows * board.cols - board.mask.bit_count() - 1
+        max_depth = max(min(self.max_depth, empty) if self.max_depth else empty, 1)
+        # Mỗi dòng: [khóa, tìm kiếm trên bản sao thế cờ sau nước trả lời, giá trị, độ sâu đã xong, độ trễ]
+        lines = []
+        for col in replies:
+            mover = board.to_move
+            board.play(col)
+            if not board.is_winner(mover) and not board.is_full():
+                child = BitBoard.from_state(board.to_state(), board.to_move, board.win_length)
+                search = _BitboardSearch(child, self.table, self.orderer, variant=self.variant, stop=stop,
+                                         reset_orderer=False)
+                lag = 0 if col == self.predicted else PREDICTED_LEAD
+                lines.append([child.key(), search, None, 0, lag])
+            board.undo()
+
+        depth = 0
+        while lines:
+            depth += 1
+            for line in list(lines):
+                key, search, value, done, lag = line
+                if depth - lag <= done:
+                    continue
+                child = search.board
+                try:
+                    col, value = search.deepen(done + 1, child.playable_columns(), value)
+                except SearchTimeout:
+                    return
+                finally:
+                    self.nodes += search.nodes
+                    search.nodes = 0
+                line[2], line[3] = value, done + 1
+                if col is not None:
+                    self.results[key] = (col, value, done + 1)
+                if done + 1 >= max_depth or abs(value) >= WIN_SCORE:
+                    lines.remove(line)
+
+    def _predict(self, board: BitBoard, stop: threading.Event) -> List[int]:
+        """Các nước trả lời của đối thủ, nước tốt nhất theo lượt tìm nông đứng đầu."""
+        center = board.cols // 2
+        replies = sorted(board.playable_columns(), key=lambda c: abs(center - c))
+        empty = board.rows * board.cols - board.mask.bit_count()
+        # Gốc nông hơn các dòng một ply, nên dùng MoveOrderer tạm để killer không lệch ply
+        search = _BitboardSearch(board, self.table, MoveOrderer(), variant=self.variant, stop=stop)
+        col, _, _ = search.iterative_deepening(min(PREDICT_DEPTH, empty), replies, math.inf)
+        self.nodes += search.nodes
+        if col is not None:
+            self.predicted = col
+            replies.remove(col)
+            replies.insert(0, col)
+        return replies
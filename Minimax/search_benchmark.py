@@ -0,0 +1,79 @@
+"""
+So sánh số node của các biến thể tìm kiếm trên cùng các thế cờ cố định.
+
+    python -m Minimax.search_benchmark [--depth 8] [--variants alphabeta pvs]
+
+Mỗi thế cờ là một dãy cột (đánh số từ 1, từ trái sang) đi từ bảng trống
+`BOARD_SIZE`, quân 1 đi trước. Mỗi biến thể chạy hai chế độ: độ sâu cố định
+(`search_root`) và tìm sâu dần tới cùng độ sâu (`iterative_deepening`, biến thể
+"pvs" dùng thêm cửa sổ aspiration). Giá trị của các biến thể phải trùng nhau.
+"""
+import argparse
+import math
+import sys
+import time
+
+from Minimax.bitboard import BitBoard
+from Minimax.minimax import VARIANTS, _BitboardSearch
+from Minimax.transposition import TranspositionTable
+from src.constants import BOARD_SIZE
+
+POSITIONS = [
+    "",
+    "36",
+    "3433",
+    "344352",
+    "243223",
+    "221621353564",
+    "34565235635162",
+    "66252413644166",
+    "56234533664266",
+]
+
+
+def board_from_moves(moves: str) -> BitBoard:
+    board = BitBoard(BOARD_SIZE[0], BOARD_SIZE[1])
+    for ch in moves:
+        board.play(int(ch) - 1)
+    return board
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare node counts of the minimax search variants")
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--table-mb", type=float, default=16, help="transposition table size")
+    args = parser.parse_args()
+
+    totals = {(variant, mode): [0, 0.0] for variant in args.variants for mode in ("fixed", "deepening")}
+    mismatches = 0
+    print(f"{'position':<16} {'mode':<10} " + " ".join(f"{variant + ' nodes':>16}" for variant in args.variants) + "  value")
+    for moves in POSITIONS:
+        for mode in ("fixed", "deepening"):
+            values = set()
+            cells = []
+            for variant in args.variants:
+                board = board_from_moves(moves)
+                search = _BitboardSearch(board, TranspositionTable(args.table_mb), variant=variant)
+                start = time.perf_counter()
+                if mode == "fixed":
+                    _, value = search.search_root(args.depth, range(board.cols))
+                else:
+                    _, value, _ = search.iterative_deepening(args.depth, range(board.cols), math.inf)
+                totals[variant, mode][0] += search.nodes
+                totals[variant, mode][1] += time.perf_counter() - start
+                values.add(value)
+                cells.append(f"{search.nodes:>16}")
+            if len(values) > 1:
+                mismatches += 1
+            shown = values.pop() if len(values) == 1 else "MISMATCH"
+            print(f"{moves or '(empty)':<16} {mode:<10} " + " ".join(cells) + f"  {shown}")
+
+    print()
+    for (variant, mode), (nodes, elapsed) in totals.items():
+        print(f"{variant:<10} {mode:<10} {nodes:>10} nodes {elapsed:>8.2f}s {nodes / elapsed / 1000.0 if elapsed else 0.0:>8.1f} knps")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
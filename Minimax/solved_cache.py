@@ -0,0 +1,217 @@
+"""
+Bộ nhớ đệm trên đĩa cho các thế cờ đã giải chính xác (bảng tàn cuộc).
+
+Tệp là một log chỉ ghi nối: header cố định rồi các bản ghi 16 byte (khóa thế
+cờ, nước tốt nhất, điểm chính xác). Thế cờ và ảnh gương của nó chung một
+bản ghi, khóa là `BitBoard.canonical_key()`. Nhiều tiến trình trên cùng máy có thể mở
+chung một tệp: mỗi lần ghi là một lần nối cả lô dưới khóa `flock`, và mỗi tiến
+trình đọc thêm các bản ghi mới của tiến trình khác khi tra trượt.
+"""
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: không có flock, chỉ an toàn khi một tiến trình ghi
+    fcntl = None
+
+from Minimax.bitboard import BitBoard
+from Minimax.transposition import NO_MOVE
+
+MAGIC = b"C4SC"
+VERSION = 2  # 2: khóa chuẩn theo phép lật gương
+# magic, version, rows, cols
+HEADER = struct.Struct("<4sHBB")
+# khóa chuẩn (BitBoard.canonical_key()), nước tốt nhất theo hướng của khóa (NO_MOVE nếu chỉ biết điểm),
+# điểm của bên sắp đi
+RECORD = struct.Struct("<Qbxxxi")
+
+# Số bản ghi mới (chưa sắp xếp) được giữ trong dict trước khi gộp vào chỉ mục sắp xếp
+_MERGE_THRESHOLD = 4096
+
+
+class SolvedCache:
+    """
+    Kho khóa -> (nước, điểm) của các thế cờ đã giải chính xác, dùng chung giữa các tiến trình.
+
+    Tra cứu: LRU trong bộ nhớ (`memory_entries` kết quả gần nhất) -> các bản ghi
+    chờ ghi -> chỉ mục các bản ghi trên đĩa (mảng khóa sắp xếp + số thứ tự bản
+    ghi, 12 byte mỗi thế cờ) rồi đọc đúng bản ghi đó từ tệp.
+    Ghi: `put` gom vào bộ đệm, `flush` nối cả lô vào cuối tệp một lần
+    (tự gọi khi bộ đệm đạt `flush_every` bản ghi và khi `close`).
+    """
+
+    def __init__(self, path: str, rows: int, cols: int, memory_entries: int = 1 << 16, flush_every: int = 256):
+        if cols * (rows + 1) > 64:
+            raise ValueError("Board is too large for 64-bit position keys")
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.memory_entries = memory_entries
+        self.flush_every = flush_every
+        self._lru: "OrderedDict[int, Tuple[int, int]]" = OrderedDict()
+        self._pending: Dict[int, Tuple[int, int]] = {}
+        # Chỉ mục bản ghi trên đĩa: phần đã sắp xếp và phần mới nạp
+        self._keys = array("Q")
+        self._records = array("I")
+        self._recent: Dict[int, int] = {}
+        self._indexed = 0  # số bản ghi đã nạp vào chỉ mục
+        self.hits = 0
+        self.misses = 0
+
+        flags = os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(path, flags, 0o644)
+        self._lock()
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.write(self._fd, HEADER.pack(MAGIC, VERSION, rows, cols))
+        finally:
+            self._unlock()
+        header = self._read_at(0, HEADER.size)
+        if len(header) != HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a solved-position cache")
+        magic, version, file_rows, file_cols = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a solved-position cache (version {VERSION})")
+        if (file_rows, file_cols) != (rows, cols):
+            self.close()
+            raise ValueError(f"{path} holds {file_rows}x{file_cols} positions, not {rows}x{cols}")
+        self._refresh()
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        # O_APPEND: mọi lần ghi vẫn đi vào cuối tệp dù vị trí đọc ở đâu
+        os.lseek(self._fd, offset, os.SEEK_SET)
+        return os.read(self._fd, size)
+
+    def _lock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def _unlock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """Ghi nốt các bản ghi đang chờ và đóng tệp."""
+        if self._fd is None:
+            return
+        if self._pending:
+            self.flush()
+        os.close(self._fd)
+        self._fd = None
+
+    def __len__(self) -> int:
+        return self._indexed + len(self._pending)
+
+    def _refresh(self) -> bool:
+        """Nạp vào chỉ mục các bản ghi trọn vẹn được nối thêm từ lần nạp trước. Trả về True nếu có."""
+        count = (os.fstat(self._fd).st_size - HEADER.size) // RECORD.size
+        if count <= self._indexed:
+            return False
+        data = self._read_at(HEADER.size + self._indexed * RECORD.size, (count - self._indexed) * RECORD.size)
+        recent = self._recent
+        for number, (key, _, _) in enumerate(RECORD.iter_unpack(data), self._indexed):
+            recent[key] = number
+        self._indexed = count
+        if len(recent) > _MERGE_THRESHOLD:
+            self._merge()
+        return True
+
+    def _merge(self) -> None:
+        """Gộp các bản ghi mới nạp vào mảng khóa sắp xếp (bản ghi sau thắng bản ghi trước)."""
+        merged = dict(zip(self._keys, self._records))
+        merged.update(self._recent)
+        keys = sorted(merged)
+        self._keys = array("Q", keys)
+        self._records = array("I", (merged[key] for key in keys))
+        self._recent = {}
+
+    def _read_disk(self, key: int) -> Optional[Tuple[int, int]]:
+        number = self._recent.get(key)
+        if number is None:
+            i = bisect_left(self._keys, key)
+            if i == len(self._keys) or self._keys[i] != key:
+                return None
+            number = self._records[i]
+        _, move, score = RECORD.unpack(self._read_at(HEADER.size + number * RECORD.size, RECORD.size))
+        return move, score
+
+    def get(self, key: int) -> Optional[Tuple[int, int]]:
+        """Trả về (nước tốt nhất hoặc NO_MOVE, điểm chính xác) của khóa `key`, hoặc None."""
+        lru = self._lru
+        entry = lru.get(key)
+        if entry is None:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._read_disk(key)
+                if entry is None and self._refresh():
+                    entry = self._read_disk(key)
+                if entry is None:
+                    self.misses += 1
+                    return None
+            self._remember(key, entry)
+        else:
+            lru.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def probe(self, board: BitBoard) -> Optional[Tuple[int, int]]:
+        """Tra thế cờ của một BitBoard (None nếu khác kích thước hoặc chưa có); nước đi theo hướng thật của bảng."""
+        if board.rows != self.rows or board.cols != self.cols:
+            return None
+        key, mirrored = board.canonical_key()
+        entry = self.get(key)
+        if entry is None or not mirrored or entry[0] == NO_MOVE:
+            return entry
+        return board.orient(entry[0], mirrored), entry[1]
+
+    def put(self, key: int, move: Optional[int], score: int) -> None:
+        """Ghi nhận kết quả chính xác; bản ghi có nước đi không bị thay bằng bản chỉ có điểm."""
+        move = NO_MOVE if move is None else move
+        known = self._lru.get(key) or self._pending.get(key)
+        if known is not None and (known[0] != NO_MOVE or move == NO_MOVE):
+            return
+        entry = (move, int(score))
+        self._pending[key] = entry
+        self._remember(key, entry)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def store(self, board: BitBoard, move: Optional[int], score: int) -> None:
+        """`put` cho thế cờ của một BitBoard (khóa chuẩn, nước đi được lật theo)."""
+        if board.rows == self.rows and board.cols == self.cols:
+            key, mirrored = board.canonical_key()
+            self.put(key, board.orient(move, mirrored), score)
+
+    def _remember(self, key: int, entry: Tuple[int, int]) -> None:
+        lru = self._lru
+        lru[key] = entry
+        lru.move_to_end(key)
+        if len(lru) > self.memory_entries:
+            lru.popitem(last=False)
+
+    def flush(self) -> None:
+        """Nối mọi bản ghi đang chờ vào cuối tệp trong một lần ghi, dưới khóa độc quyền."""
+        if not self._pending:
+            return
+        self._lock()
+        try:
+            # Nạp bản ghi của tiến trình khác trước để không ghi trùng
+            self._refresh()
+            data = b"".join(
+                RECORD.pack(key, move, score)
+                for key, (move, score) in self._pending.items()
+                if move != NO_MOVE or self._read_disk(key) is None
+            )
+            if data:
+                os.write(self._fd, data)
+        finally:
+            self._unlock()
+        self._pending.clear()
+        self._refresh()
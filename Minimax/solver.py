@@ -0,0 +1,250 @@
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from Minimax.bitboard import BitBoard
+from Minimax.minimax import SearchTimeout
+from Minimax.threats import non_losing_mask
+from Minimax.transposition import LOWER, NO_MOVE, UPPER, TranspositionTable
+
+if TYPE_CHECKING:
+    from Minimax.solved_cache import SolvedCache
+
+BoardState = Sequence[Sequence[int]]
+
+# Số node giữa hai lần đọc đồng hồ (lũy thừa của 2 trừ 1)
+_CLOCK_CHECK_MASK = 1023
+
+
+class SolveResult:
+    """
+    Kết quả chính xác của một thế cờ theo góc nhìn bên sắp đi.
+
+    `score` theo quy ước của Pascal Pons: dương nếu thắng, âm nếu thua, 0 nếu
+    hòa; thắng càng sớm thì trị tuyệt đối càng lớn. `outcome` là "win", "loss"
+    hoặc "draw" và `plies` là số nước (của cả hai bên, kể cả nước quyết định)
+    cho tới khi ván kết thúc với cả hai bên chơi tối ưu.
+    """
+
+    __slots__ = ("score", "outcome", "plies")
+
+    def __init__(self, score: int, moves_played: int, cells: int):
+        self.score = score
+        if score > 0:
+            self.outcome = "win"
+            self.plies = 2 * ((cells + 1 - moves_played) // 2 - score) + 1
+        elif score < 0:
+            self.outcome = "loss"
+            self.plies = 2 * ((cells - moves_played) // 2 + score + 1)
+        else:
+            self.outcome = "draw"
+            self.plies = cells - moves_played
+
+    def __repr__(self) -> str:
+        return f"SolveResult({self.outcome}, score={self.score}, plies={self.plies})"
+
+
+class Solver:
+    """
+    Bộ giải chính xác: negamax alpha-beta chỉ trên các nước không thua ngay,
+    tìm giá trị bằng chuỗi null-window (chia đôi khoảng điểm, kiểu MTD),
+    bảng chuyển vị lưu cận trên/dưới và sắp xếp ưu tiên nước tạo nhiều đe dọa.
+    """
+
+    def __init__(self, table_size_mb: float = 64):
+        self.table = TranspositionTable(table_size_mb)
+        self.nodes = 0
+        self.deadline: Optional[float] = None
+        self.stop: Optional[threading.Event] = None
+        self.board: Optional[BitBoard] = None
+        self._cells = 0
+        self._order: List[int] = []
+        self._column_bits: List[int] = []
+
+    def _prepare(self, board: BitBoard) -> None:
+        self.board = board
+        self._cells = board.rows * board.cols
+        center = board.cols // 2
+        self._order = sorted(range(board.cols), key=lambda c: abs(center - c))
+        self._column_bits = [((1 << board.rows) - 1) << (c * board.height) for c in range(board.cols)]
+
+    def _can_win_next(self) -> bool:
+        board = self.board
+        return bool(board.winning_cells(board.to_move) & board.playable_mask())
+
+    def _negamax(self, alpha: int, beta: int) -> int:
+        """Giả định bên sắp đi không thể thắng ngay (được bảo đảm bởi nút cha)."""
+        self.nodes += 1
+        if not self.nodes & _CLOCK_CHECK_MASK and (
+            (self.deadline is not None and time.perf_counter() > self.deadline)
+            or (self.stop is not None and self.stop.is_set())
+        ):
+            raise SearchTimeout()
+        board = self.board
+        cells = self._cells
+        moves_played = board.mask.bit_count()
+
+        candidates = non_losing_mask(board)
+        if not candidates:
+            return -((cells - moves_played) // 2)
+        if moves_played >= cells - 2:
+            return 0
+
+        # Không thể thua sớm hơn 2 nước nữa
+        lowest = -((cells - 2 - moves_played) // 2)
+        if alpha < lowest:
+            alpha = lowest
+            if alpha >= beta:
+                return alpha
+        # Không thể thắng ngay (giả định) nên không thắng sớm hơn 1 nước nữa
+        highest = (cells - 1 - moves_played) // 2
+        # Giá trị chính xác không đổi khi lật bàn cờ nên thế cờ và ảnh gương dùng chung một ô
+        key = board.hash
+        mirrored = board.mirror_hash < key
+        if mirrored:
+            key = board.mirror_hash
+        entry = self.table.probe(key)
+        if entry is not None:
+            _, flag, value, _ = entry
+            if flag == UPPER:
+                if value < highest:
+                    highest = value
+            elif value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    return alpha
+        if beta > highest:
+            beta = highest
+            if alpha >= beta:
+                return beta
+
+        # Sắp xếp: nước tạo nhiều ô thắng (đe dọa) hơn trước, hòa thì gần cột giữa
+        piece = board.to_move
+        scored = []
+        for col in self._order:
+            if candidates & self._column_bits[col]:
+                board.play(col)
+                scored.append((board.winning_cells(piece).bit_count(), col))
+                board.undo()
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        empty = cells - moves_played
+        for _, col in scored:
+            board.play(col)
+            try:
+                score = -self._negamax(-beta, -alpha)
+            finally:
+                board.undo()
+            if score >= beta:
+                self.table.store(key, empty, LOWER, score, board.orient(col, mirrored), moves_played)
+                return score
+            if score > alpha:
+                alpha = score
+        self.table.store(key, empty, UPPER, alpha, None, moves_played)
+        return alpha
+
+    def solve(
+        self,
+        board: BitBoard,
+        deadline: Optional[float] = None,
+        cache: Optional["SolvedCache"] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Điểm chính xác của thế cờ (theo góc nhìn bên sắp đi). Thu hẹp khoảng
+        [min, max] bằng các lần tìm null-window cho tới khi khoảng chỉ còn một giá trị.
+        Ném SearchTimeout nếu vượt `deadline` (giá trị của time.perf_counter)
+        hoặc khi Event `stop` được đặt.
+        `cache`: kho thế cờ đã giải, được tra trước và ghi lại kết quả.
+        """
+        if cache is not None:
+            entry = cache.probe(board)
+            if entry is not None:
+                return entry[1]
+        score = self._solve(board, deadline, stop)
+        if cache is not None:
+            cache.store(board, None, score)
+        return score
+
+    def _solve(self, board: BitBoard, deadline: Optional[float], stop: Optional[threading.Event]) -> int:
+        self._prepare(board)
+        self.deadline = deadline
+        self.stop = stop
+        cells = self._cells
+        moves_played = board.mask.bit_count()
+        if self._can_win_next():
+            return (cells + 1 - moves_played) // 2
+        low = -((cells - moves_played) // 2)
+        high = (cells + 1 - moves_played) // 2
+        while low < high:
+            med = low + (high - low) // 2
+            # Thử gần 0 trước: kiểm tra thắng/thua nhanh hơn nhiều so với tìm đúng khoảng cách
+            if med <= 0 and int(low / 2) < med:
+                med = int(low / 2)
+            elif med >= 0 and int(high / 2) > med:
+                med = int(high / 2)
+            result = self._negamax(med, med + 1)
+            if result <= med:
+                high = result
+            else:
+                low = result
+        return low
+
+    def best_move(
+        self,
+        board: BitBoard,
+        allowed_actions: Sequence[int],
+        deadline: Optional[float] = None,
+        cache: Optional["SolvedCache"] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Tuple[Optional[int], Optional[SolveResult]]:
+        """
+        Nước tối ưu trong `allowed_actions` và kết quả chính xác sau khi đi nước đó
+        (theo góc nhìn bên sắp đi ở gốc). Ném SearchTimeout nếu vượt `deadline`
+        hoặc khi Event `stop` được đặt.
+        `cache`: kho thế cờ đã giải; thế cờ gốc và các thế cờ con được tra trước
+        và ghi lại sau khi giải.
+        """
+        self.nodes = 0
+        cells = board.rows * board.cols
+        moves_played = board.mask.bit_count()
+        self.table.new_search(moves_played)
+        playable = board.playable_columns()
+        considers_all = all(col in allowed_actions for col in playable)
+        if cache is not None:
+            entry = cache.probe(board)
+            if entry is not None and entry[0] != NO_MOVE and entry[0] in allowed_actions and board.can_play(entry[0]):
+                return entry[0], SolveResult(entry[1], moves_played, cells)
+        center = board.cols // 2
+        piece = board.to_move
+        best_col: Optional[int] = None
+        best_score = None
+        immediate_win = (cells + 1 - moves_played) // 2
+        for col in sorted(range(board.cols), key=lambda c: abs(center - c)):
+            if col not in allowed_actions or not board.can_play(col):
+                continue
+            board.play(col)
+            try:
+                if board.is_winner(piece):
+                    score = immediate_win
+                elif board.is_full():
+                    score = 0
+                else:
+                    score = -self.solve(board, deadline, cache, stop)
+            finally:
+                board.undo()
+            if best_score is None or score > best_score:
+                best_col, best_score = col, score
+                if score == immediate_win:
+                    break  # thắng ngay: không có gì tốt hơn
+        if best_col is None:
+            return None, None
+        # Chỉ khi mọi nước đã được xét thì giá trị nước tốt nhất mới là giá trị của thế cờ
+        if cache is not None and considers_all:
+            cache.store(board, best_col, best_score)
+        return best_col, SolveResult(best_score, moves_played, cells)
+
+    def analyze(self, state: BoardState, piece: int, deadline: Optional[float] = None) -> SolveResult:
+        """Kết quả chính xác của một bảng 2D với `piece` là bên sắp đi."""
+        board = BitBoard.from_state(state, piece)
+        return SolveResult(self.solve(board, deadline), board.mask.bit_count(), board.rows * board.cols)
@@ -0,0 +1,87 @@
+"""
+Benchmark bộ giải chính xác trên các thế cờ cố định của bảng chuẩn 7 cột x 6 hàng.
+
+    python -m Minimax.solver_benchmark [--max-ms 30000]
+
+Mỗi thế cờ là một dãy cột (đánh số từ 1, từ trái sang) đi từ bảng trống, quân 1
+đi trước. Điểm kỳ vọng theo quy ước của Pascal Pons (xem `SolveResult`) đã được
+kiểm chứng bằng một bộ tìm kiếm vét cạn độc lập trước khi đưa vào đây.
+"""
+import argparse
+import sys
+import time
+
+from Minimax.bitboard import BitBoard
+from Minimax.minimax import SearchTimeout
+from Minimax.solver import SolveResult, Solver
+
+ROWS, COLS = 6, 7
+
+# (nhóm, dãy nước, điểm kỳ vọng), xếp từ dễ tới khó
+POSITIONS = [
+    ("end", "4647323223644363344662226", 3),
+    ("end", "4577354554124227377654224", -4),
+    ("end", "2513254452332434463264536277", -2),
+    ("end", "152743244533747223774334722", -3),
+    ("end", "14175445733355111435477", 5),
+    ("middle-easy", "7577374473212352233454", -4),
+    ("middle-easy", "4575342123223554453433", -3),
+    ("middle-easy", "5446565544354451111", -6),
+    ("middle-easy", "75357454334452554", -2),
+    ("middle", "36743644662273774", 5),
+    ("middle", "432354672655366", 10),
+    ("middle", "531737331527722", -4),
+    ("middle", "4647323223644", 3),
+    ("middle", "157225343553414", -1),
+    ("middle", "72676466333226", 2),
+    ("middle", "56737556776536", 4),
+    ("middle", "343443355674", 1),
+]
+
+
+def board_from_moves(moves: str) -> BitBoard:
+    board = BitBoard(ROWS, COLS)
+    for ch in moves:
+        board.play(int(ch) - 1)
+    return board
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the exact Connect 4 solver")
+    parser.add_argument("--max-ms", type=float, default=None, help="time budget per position")
+    parser.add_argument("--table-mb", type=float, default=64, help="transposition table size")
+    args = parser.parse_args()
+
+    failures = 0
+    total_nodes = 0
+    total_time = 0.0
+    print(f"{'group':<12} {'stones':>6} {'expected':>8} {'score':>6} {'result':<18} {'nodes':>10} {'time':>8} {'knps':>7}")
+    for group, moves, expected in POSITIONS:
+        board = board_from_moves(moves)
+        # Bảng mới cho mỗi thế cờ: thời gian đo không hưởng lợi từ thế cờ trước
+        solver = Solver(args.table_mb)
+        deadline = None if args.max_ms is None else time.perf_counter() + args.max_ms / 1000.0
+        start = time.perf_counter()
+        try:
+            score = solver.solve(board, deadline)
+        except SearchTimeout:
+            score = None
+        elapsed = time.perf_counter() - start
+        total_nodes += solver.nodes
+        total_time += elapsed
+        if score is None:
+            shown, result = "-", "timeout"
+        else:
+            solved = SolveResult(score, len(moves), ROWS * COLS)
+            shown, result = str(score), f"{solved.outcome} in {solved.plies}"
+            if score != expected:
+                failures += 1
+                result = "WRONG " + result
+        knps = solver.nodes / elapsed / 1000.0 if elapsed > 0 else 0.0
+        print(f"{group:<12} {len(moves):>6} {expected:>8} {shown:>6} {result:<18} {solver.nodes:>10} {elapsed:>7.2f}s {knps:>7.1f}")
+    print(f"total: {total_nodes} nodes in {total_time:.2f}s, {failures} wrong")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
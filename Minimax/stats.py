@@ -0,0 +1,96 @@
+import json
+import time
+from typing import IO, Any, Dict, List, Optional, Union
+
+
+class SearchStats:
+    """
+    Số liệu của một lần gọi `choose_best_action`.
+
+    `source` cho biết nước đi đến từ đâu: "cache" (kho thế cờ đã giải), "solver"
+    (bộ giải chính xác) hoặc "search" (tìm kiếm heuristic); khi bộ giải hết giờ
+    rồi mới tìm kiếm, `solver_nodes` vẫn giữ số node bộ giải đã duyệt.
+    `MinimaxPlayer` dùng thêm "threat" (nước bắt buộc), "book" (sách khai cuộc) và
+    "ponder" (kết quả tìm nền trong lượt của đối thủ).
+    """
+
+    __slots__ = (
+        "source", "move", "value", "depth", "nodes", "leaves", "expanded",
+        "cutoffs", "first_move_cutoffs", "tt_cutoffs", "researches", "solver_nodes", "elapsed",
+    )
+
+    def __init__(self) -> None:
+        self.source = "search"
+        self.move: Optional[int] = None
+        self.value: Optional[float] = None
+        self.depth = 0  # độ sâu của vòng tìm kiếm hoàn tất sâu nhất
+        self.nodes = 0
+        self.leaves = 0  # số lần đánh giá heuristic ở nút lá
+        self.expanded = 0  # số nút trong đã duyệt các nước con
+        self.cutoffs: List[int] = []  # số lần cắt beta theo ply tính từ gốc
+        self.first_move_cutoffs = 0  # số lần cắt ngay ở nước đầu tiên được thử
+        self.tt_cutoffs = 0  # số nút trả về ngay nhờ bảng chuyển vị
+        self.researches = 0  # số lần tìm lại của PVS/aspiration
+        self.solver_nodes = 0
+        self.elapsed = 0.0  # giây
+
+    @property
+    def branching_factor(self) -> float:
+        """Số nước con trung bình được duyệt ở mỗi nút trong."""
+        return self.nodes / self.expanded if self.expanded else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """Tỉ lệ cắt beta xảy ra ngay ở nước đầu tiên, đo chất lượng sắp xếp (càng gần 1 càng tốt)."""
+        total = sum(self.cutoffs)
+        return self.first_move_cutoffs / total if total else 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return (self.nodes + self.solver_nodes) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {name: getattr(self, name) for name in self.__slots__}
+        # Cắt các ply không có lần cắt nào ở cuối cho gọn
+        cutoffs = list(self.cutoffs)
+        while cutoffs and not cutoffs[-1]:
+            cutoffs.pop()
+        record["cutoffs"] = cutoffs
+        if self.value is not None and abs(self.value) == float("inf"):
+            record["value"] = None
+        record["branching_factor"] = round(self.branching_factor, 3)
+        record["first_move_cutoff_rate"] = round(self.first_move_cutoff_rate, 3)
+        record["nodes_per_second"] = round(self.nodes_per_second, 1)
+        return record
+
+    def __repr__(self) -> str:
+        return (
+            f"SearchStats(source={self.source}, move={self.move}, value={self.value}, depth={self.depth}, "
+            f"nodes={self.nodes}, leaves={self.leaves}, bf={self.branching_factor:.2f}, "
+            f"elapsed={self.elapsed * 1000:.1f}ms, nps={self.nodes_per_second:.0f})"
+        )
+
+
+class JsonLinesTrace:
+    """
+    Ghi số liệu mỗi nước đi thành một dòng JSON (định dạng JSON Lines) vào tệp
+    hoặc luồng đã mở, để hệ thống thu thập số liệu đọc dần.
+    """
+
+    def __init__(self, target: Union[str, IO[str]]):
+        if isinstance(target, str):
+            self._stream = open(target, "a", encoding="utf-8")
+            self._owns_stream = True
+        else:
+            self._stream = target
+            self._owns_stream = False
+
+    def write(self, stats: SearchStats, **fields: Any) -> None:
+        """Ghi một bản ghi gồm thời điểm, các trường bổ sung `fields` và số liệu `stats`."""
+        record = {"timestamp": time.time(), **fields, **stats.to_dict()}
+        self._stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._stream.flush()
+
+    def close(self) -> None:
+        if self._owns_stream:
+            self._stream.close()
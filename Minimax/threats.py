@@ -0,0 +1,95 @@
+from typing import List, Optional
+
+from Minimax.bitboard import BitBoard
+
+
+def non_losing_mask(board: BitBoard, opp_win: Optional[int] = None) -> int:
+    """
+    Mặt nạ các ô bên sắp đi có thể đặt mà không để đối thủ thắng ngay ở nước sau:
+    nếu đối thủ có đúng một ô thắng đặt được thì chỉ còn ô đó (hai ô trở lên thì
+    mọi nước đều thua, trả về 0), và không đặt ngay dưới ô thắng của đối thủ.
+    Giả định bên sắp đi không thắng ngay được. `opp_win`: `winning_cells` của đối thủ nếu đã tính.
+    """
+    possible = board.playable_mask()
+    if opp_win is None:
+        opp_win = board.winning_cells(3 - board.to_move)
+    forced = possible & opp_win
+    if forced:
+        if forced & (forced - 1):
+            return 0  # hai ô phải chặn cùng lúc: thua
+        possible = forced
+    return possible & ~(opp_win >> 1)
+
+
+def safe_moves_mask(board: BitBoard, own_win: Optional[int] = None, opp_win: Optional[int] = None) -> int:
+    """
+    Các ô đáng xét cho bên sắp đi: chỉ các ô thắng ngay nếu có, nếu không thì
+    `non_losing_mask`. Trả về 0 khi mọi nước đều thua ngay (khi đó nên xét hết).
+    `own_win`, `opp_win`: `winning_cells` của hai bên nếu đã tính.
+    """
+    if own_win is None:
+        own_win = board.winning_cells(board.to_move)
+    wins = own_win & board.playable_mask()
+    if wins:
+        return wins
+    return non_losing_mask(board, opp_win)
+
+
+class ThreatAnalysis:
+    """
+    Phân tích đe dọa của thế cờ cho bên sắp đi (các cột theo thứ tự ưu tiên cột giữa):
+
+    - `wins`: cột thắng ngay.
+    - `blocks`: cột phải chặn vì đối thủ thắng ngay ở đó.
+    - `losing`: cột đặt ngay dưới ô thắng của đối thủ (trao cho đối thủ nước thắng).
+    - `double_threats`: cột không thua tạo ra từ hai ô thắng đặt được trở lên, đối thủ không chặn hết.
+    - `forced_move`: nước không cần tìm kiếm (thắng ngay, chặn duy nhất, nước không thua
+      duy nhất hoặc đe dọa kép), hoặc None.
+    """
+
+    __slots__ = ("wins", "blocks", "losing", "double_threats", "forced_move")
+
+    def __init__(self, board: BitBoard):
+        piece = board.to_move
+        opp = 3 - piece
+        height = board.height
+        center = board.cols // 2
+        order = sorted(range(board.cols), key=lambda c: abs(center - c))
+        playable = board.playable_mask()
+        own_win = board.winning_cells(piece)
+        opp_win = board.winning_cells(opp)
+
+        def columns(mask: int) -> List[int]:
+            return [c for c in order if board.can_play(c) and mask >> (c * height + board.heights[c]) & 1]
+
+        self.wins = columns(own_win & playable)
+        self.blocks = columns(opp_win & playable)
+        self.losing = columns(playable & (opp_win >> 1))
+        safe = non_losing_mask(board, opp_win)
+
+        self.double_threats = []
+        if not self.wins:
+            for col in columns(safe):
+                board.play(col)
+                threats = board.winning_cells(piece) & board.playable_mask()
+                board.undo()
+                if threats & (threats - 1):
+                    self.double_threats.append(col)
+
+        if self.wins:
+            self.forced_move: Optional[int] = self.wins[0]
+        elif len(self.blocks) == 1:
+            self.forced_move = self.blocks[0]
+        elif self.blocks:
+            self.forced_move = None  # không chặn hết được: để tìm kiếm chọn nước kéo dài nhất
+        elif self.double_threats:
+            self.forced_move = self.double_threats[0]
+        else:
+            candidates = columns(safe)
+            self.forced_move = candidates[0] if len(candidates) == 1 else None
+
+    def __repr__(self) -> str:
+        return (
+            f"ThreatAnalysis(wins={self.wins}, blocks={self.blocks}, losing={self.losing}, "
+            f"double_threats={self.double_threats}, forced_move={self.forced_move})"
+        )
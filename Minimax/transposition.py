@@ -0,0 +1,118 @@
+from array import array
+from typing import Dict, Optional, Tuple
+
+# Loại cận của giá trị được lưu
+EXACT = 0
+LOWER = 1  # giá trị thật >= value (đã cắt beta)
+UPPER = 2  # giá trị thật <= value (không nước nào vượt alpha)
+
+NO_MOVE = -1
+
+# Số byte mỗi ô của bảng: key (8) + value (4) + depth, flag, move, số quân (1 mỗi loại)
+ENTRY_BYTES = 16
+
+
+class TranspositionTable:
+    """
+    Bảng chuyển vị kích thước cố định, đánh chỉ số bằng Zobrist hash.
+    Dữ liệu nằm trong các `array` song song nên bộ nhớ không vượt quá
+    `size_mb` bất kể số thế cờ gặp phải.
+
+    Bảng được giữ qua các nước trong một ván. Mỗi ô ghi số quân trên bàn của
+    thế cờ; `new_search(root_stones)` báo số quân ở gốc của lượt tìm mới, và ô
+    có ít quân hơn gốc không bao giờ gặp lại được (số quân chỉ tăng) nên bị thu
+    hồi trước tiên. Các ô còn lại theo chính sách ưu tiên độ sâu: ô đã có thế cờ
+    khác chỉ bị ghi đè khi nước lưu mới sâu bằng hoặc hơn.
+    """
+
+    def __init__(self, size_mb: float = 16):
+        capacity = 1
+        while capacity * 2 * ENTRY_BYTES <= size_mb * 1024 * 1024:
+            capacity *= 2
+        self.capacity = capacity
+        self._index_mask = capacity - 1
+        self.keys = array("Q", bytes(8 * capacity))
+        self.values = array("i", bytes(4 * capacity))
+        self.depths = array("b", [-1]) * capacity
+        self.flags = array("b", bytes(capacity))
+        self.moves = array("b", [NO_MOVE]) * capacity
+        self.stones = array("B", bytes(capacity))
+        self.root_stones = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.rejected = 0
+        self.reclaimed = 0
+
+    def new_search(self, root_stones: int) -> None:
+        """
+        Đánh dấu bắt đầu một lượt tìm kiếm từ thế cờ có `root_stones` quân;
+        ô của các thế cờ ít quân hơn được thu hồi khi cần chỗ.
+        """
+        self.root_stones = root_stones
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """Trả về (depth, flag, value, move) nếu thế cờ có trong bảng, ngược lại None."""
+        i = key & self._index_mask
+        if self.depths[i] >= 0 and self.keys[i] == key:
+            self.hits += 1
+            return self.depths[i], self.flags[i], self.values[i], self.moves[i]
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, flag: int, value: int, move: Optional[int], stones: int) -> None:
+        """Lưu kết quả tìm kiếm của thế cờ có `stones` quân theo chính sách thay thế ở trên."""
+        i = key & self._index_mask
+        old_depth = self.depths[i]
+        if old_depth >= 0 and self.keys[i] != key:
+            if self.stones[i] < self.root_stones:
+                self.reclaimed += 1
+            elif depth < old_depth:
+                self.rejected += 1
+                return
+            else:
+                self.overwrites += 1
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.flags[i] = flag
+        self.values[i] = int(value)
+        self.moves[i] = NO_MOVE if move is None else move
+        self.stones[i] = stones
+        self.stores += 1
+
+    def clear(self) -> None:
+        """Xóa toàn bộ bảng và bộ đếm."""
+        capacity = self.capacity
+        self.depths = array("b", [-1]) * capacity
+        self.moves = array("b", [NO_MOVE]) * capacity
+        self.root_stones = 0
+        self.hits = self.misses = self.stores = self.overwrites = self.rejected = self.reclaimed = 0
+
+    def used(self) -> int:
+        """Số ô đang chứa dữ liệu."""
+        return self.capacity - self.depths.count(-1)
+
+    def live(self) -> int:
+        """Số ô còn gặp lại được từ gốc hiện tại (không tính ô chờ thu hồi)."""
+        root = self.root_stones
+        depths = self.depths
+        return sum(1 for i, stones in enumerate(self.stones) if stones >= root and depths[i] >= 0)
+
+    def stats(self) -> Dict[str, float]:
+        """Các bộ đếm để định cỡ bảng."""
+        probes = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "memory_bytes": self.capacity * ENTRY_BYTES,
+            "used": self.used(),
+            "live": self.live(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "rejected": self.rejected,
+            "reclaimed": self.reclaimed,
+        }
@@ -4,6 +4,8 @@ from src.constants import BLUE, RED, SLOT_SIZE
 class Coin():
     """A class that represents the coin pieces used in connect 4"""
     
+    __slots__ = ('coin_type', 'surface', 'color', 'x_pos', 'y_pos', 'col', 'row')
+    
     RADIUS = 30
     
     def __init__(self, coin_type):
@@ -12,12 +14,21 @@ class Coin():
         (integer that represents its color)
         """
         self.coin_type = coin_type
-        self.surface = pygame.Surface((SLOT_SIZE - 3, SLOT_SIZE - 3))
+        # created on first use, so coins that are never drawn cost no Surface
+        self.surface = None
         if (self.coin_type == 1):
             self.color = BLUE
         else:
             self.color = RED
     
+    def get_surface(self):
+        """
+        Return the surface the coin is drawn on, creating it the first time
+        """
+        if self.surface is None:
+            self.surface = pygame.Surface((SLOT_SIZE - 3, SLOT_SIZE - 3)).convert()
+        return self.surface
+    
     def set_position(self, x1, y1):
         """
         Set the position of the coin on the screen
@@ -54,8 +65,9 @@ class Coin():
         Move the coin to the column that is right of its current column
         """
         self.set_column(self.col + 1)
-        self.surface.fill((0,0,0))
-        background.blit(self.surface, (self.x_pos, self.y_pos))
+        surface = self.get_surface()
+        surface.fill((0,0,0))
+        background.blit(surface, (self.x_pos, self.y_pos))
         self.set_position(self.x_pos + step * SLOT_SIZE, self.y_pos)
         self.draw(background)
             
@@ -64,8 +76,9 @@ class Coin():
         Move the coin to the column that is left of its current column
         """
         self.set_column(self.col - 1)
-        self.surface.fill((0,0,0))
-        background.blit(self.surface, (self.x_pos, self.y_pos))
+        surface = self.get_surface()
+        surface.fill((0,0,0))
+        background.blit(surface, (self.x_pos, self.y_pos))
         self.set_position(self.x_pos - SLOT_SIZE, self.y_pos)
         self.draw(background)  
             
@@ -74,11 +87,12 @@ class Coin():
         Drop the coin to the bottom most possible slot in its column
         """
         self.set_row(row_num)
-        self.surface.fill((0,0,0))
-        background.blit(self.surface, (self.x_pos, self.y_pos))
+        surface = self.get_surface()
+        surface.fill((0,0,0))
+        background.blit(surface, (self.x_pos, self.y_pos))
         self.set_position(self.x_pos, self.y_pos + ((self.row + 1) * SLOT_SIZE))
-        self.surface.fill((255,255,255))
-        background.blit(self.surface, (self.x_pos, self.y_pos))
+        surface.fill((255,255,255))
+        background.blit(surface, (self.x_pos, self.y_pos))
         self.draw(background) 
             
     def get_coin_type(self):
@@ -91,6 +105,6 @@ class Coin():
         """
         Draw the coin on the screen
         """
-        pygame.draw.circle(self.surface, self.color, (SLOT_SIZE // 2, SLOT_SIZE // 2), Coin.RADIUS)
-        self.surface = self.surface.convert()
-        background.blit(self.surface, (self.x_pos, self.y_pos))    
+        surface = self.get_surface()
+        pygame.draw.circle(surface, self.color, (SLOT_SIZE // 2, SLOT_SIZE // 2), Coin.RADIUS)
+        background.blit(surface, (self.x_pos, self.y_pos))    
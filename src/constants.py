@@ -4,5 +4,6 @@ BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BOARD_SIZE = (7,6)
+WIN_SEQUENCE_LENGTH = 4
 SLOT_SIZE = 80
 FONT_NAME = 'mono'
@@ -0,0 +1,394 @@
+import random
+from functools import lru_cache
+import numpy as np
+from src.constants import BOARD_SIZE, WIN_SEQUENCE_LENGTH
+from src.geometry import get_geometry
+
+class ColumnFullException(Exception):
+    """An exception that will be thrown if a column of the board is full"""
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
+
+@lru_cache(maxsize=None)
+def row_slices(num_cells, num_columns):
+    """
+    Return the slices of the flat cells that hold each row of a board
+    """
+    return tuple(slice(i, i + num_columns) for i in range(0, num_cells, num_columns))
+
+class BoardState(tuple):
+    """
+    An immutable snapshot of the board: the tuple of row tuples that
+    get_state() returns, which also keeps its cells as bytes and its hash,
+    computed once when the snapshot is taken. The hash is the one of the
+    equal plain tuple, so both kinds can be mixed as dict keys
+    """
+
+    def __new__(cls, cells, num_columns):
+        """
+        Take a snapshot of the flat cells of a board with num_columns columns
+        """
+        cells = bytes(cells)
+        state = tuple.__new__(cls, [tuple(cells[row]) for row in row_slices(len(cells), num_columns)])
+        state.cells = cells
+        state.num_columns = num_columns
+        state.hash_value = tuple.__hash__(state)
+        return state
+
+    def __hash__(self):
+        return self.hash_value
+
+    def __reduce__(self):
+        return (BoardState, (self.cells, self.num_columns))
+
+    def array(self):
+        """
+        Return the cells as a read-only numpy int8 array of shape
+        (rows, columns) that shares the memory of the snapshot
+        """
+        return np.frombuffer(self.cells, dtype=np.int8).reshape(len(self), self.num_columns)
+
+class BoardCore():
+    """
+    The state of a connect 4 board with no display attached, so games can be
+    played where pygame or a display is not available. The contents are kept
+    in bytearrays and the attributes in __slots__, so a board costs well under
+    a kilobyte and thousands of them can be held for analysis or replay
+    """
+
+    __slots__ = ('num_rows', 'num_columns', 'total_slots', 'num_slots_filled',
+                 'last_value', 'cells', 'column_heights', 'prev_cells', 'prev_move',
+                 'moves', 'winner', 'win_ply', 'geometry', 'state', 'prev_state')
+
+    def __init__(self, num_rows, num_columns, win_length=WIN_SEQUENCE_LENGTH):
+        """
+        Initialize an empty board with num_rows rows and num_columns columns,
+        where win_length coins in a row win
+        """
+        self.num_rows = num_rows
+        self.num_columns = num_columns
+        self.total_slots = num_rows * num_columns
+        self.num_slots_filled = 0
+        self.last_value = 0
+
+        # compact representation of the board contents: one coin type per
+        # slot (0 if empty), flattened row by row with row 0 at the top,
+        # the same cell layout as src.geometry
+        self.cells = bytearray(self.total_slots)
+        # number of coins in each column, so the next free row of column j is
+        # num_rows - 1 - column_heights[j]
+        self.column_heights = bytearray(num_columns)
+        # the cells as they were before the last move
+        self.prev_cells = bytearray(self.total_slots)
+        self.prev_move = (None, None, None)
+        # the columns played so far, in order; the coin type of each move is
+        # the content of the slot it landed in
+        self.moves = bytearray()
+        # coin type of the first player to complete a line (0 if none) and
+        # the number of moves played when it happened
+        self.winner = 0
+        self.win_ply = 0
+        self.geometry = get_geometry(num_rows, num_columns, win_length)
+        # BoardState snapshots of cells and prev_cells, taken on demand and
+        # dropped whenever a move is pushed or popped
+        self.state = None
+        self.prev_state = None
+
+    def check_column_fill(self, col_num):
+        """
+        Return True iff the column col_num on the board is filled up
+        """
+        return self.column_heights[col_num] == self.num_rows
+
+    def drop_coin(self, col_num, coin_type):
+        """
+        Drop a coin of type coin_type in column col_num, update the board
+        state and return the row it lands in
+        """
+        return self.push(col_num, coin_type)
+
+    def push(self, col_num, coin_type=None):
+        """
+        Play a coin in column col_num on top of the move history and return
+        the row it lands in; coin_type defaults to the opposite of the last
+        coin played (1 on an empty board). Together with pop, this lets a
+        search explore from the live position without copying the board
+        """
+        if self.check_column_fill(col_num):
+            raise ColumnFullException('Column is already filled!')
+        if coin_type is None:
+            coin_type = 2 if self.last_value == 1 else 1
+        row_index = self.num_rows - 1 - self.column_heights[col_num]
+        cell = row_index * self.num_columns + col_num
+        if (self.prev_move[0] != None):
+            (prev_row, prev_col, value) = self.prev_move
+            self.prev_cells[prev_row * self.num_columns + prev_col] = value
+        self.prev_move = (row_index, col_num, coin_type)
+        self.state = self.prev_state = None
+        self.cells[cell] = coin_type
+        self.column_heights[col_num] += 1
+        self.num_slots_filled += 1
+        self.last_value = coin_type
+        self.moves.append(col_num)
+        if not self.winner and self.geometry.is_line_win(self.cells, cell, coin_type):
+            self.winner = coin_type
+            self.win_ply = len(self.moves)
+        return row_index
+
+    def pop(self):
+        """
+        Take back the last move of the history and return its column
+        """
+        if self.win_ply == len(self.moves):
+            self.winner = 0
+            self.win_ply = 0
+        col_num = self.moves.pop()
+        num_columns = self.num_columns
+        self.state = self.prev_state = None
+        self.column_heights[col_num] -= 1
+        self.cells[(self.num_rows - 1 - self.column_heights[col_num]) * num_columns + col_num] = 0
+        self.num_slots_filled -= 1
+        if self.moves:
+            # the move before becomes the last one, so it leaves prev_cells
+            prev_col = self.moves[-1]
+            prev_row = self.num_rows - self.column_heights[prev_col]
+            value = self.cells[prev_row * num_columns + prev_col]
+            self.prev_cells[prev_row * num_columns + prev_col] = 0
+            self.prev_move = (prev_row, prev_col, value)
+            self.last_value = value
+        else:
+            self.prev_move = (None, None, None)
+            self.last_value = 0
+        return col_num
+
+    def determine_row_to_insert(self, col_num):
+        """
+        Determine the row in which the coin can be dropped into
+        """
+        return self.num_rows - 1 - self.column_heights[col_num]
+
+    def get_dimensions(self):
+        """
+        Return the dimensions of the board
+        """
+        return (self.num_rows, self.num_columns)
+
+    def check_board_filled(self):
+        """
+        Return true iff the board is completely filled
+        """
+        return (self.total_slots == self.num_slots_filled)
+
+    def get_available_actions(self):
+        """
+        Return the available moves
+        """
+        num_rows = self.num_rows
+        return [i for (i, height) in enumerate(self.column_heights) if height < num_rows]
+
+    def get_state(self):
+        """
+        Return the 2d numerical representation of the board as a BoardState,
+        the same object until the next move
+        """
+        if self.state is None:
+            self.state = BoardState(self.cells, self.num_columns)
+        return self.state
+
+    def get_prev_state(self):
+        """
+        Return the previous state of the board as a BoardState, the same
+        object until the next move
+        """
+        if self.prev_state is None:
+            self.prev_state = BoardState(self.prev_cells, self.num_columns)
+        return self.prev_state
+
+class GameLogic():
+    """
+    A class that determines whether the game is over and who won; the win
+    length is the one of the board (BoardCore win_length)
+    """
+
+    def __init__(self, board):
+        """
+        Initialize the GameLogic object with a reference to the game board
+        """
+        self.board = board
+        (num_rows, num_columns) = self.board.get_dimensions()
+        self.board_rows = num_rows
+        self.board_cols = num_columns
+        self.winner_value = 0
+
+    def check_game_over(self):
+        """
+        Check whether the game is over which can be because of a tie or one
+        of two players have won; the board already checked for a win when
+        the last coin was pushed
+        """
+        player_won = self.board.winner != 0
+        if player_won:
+            self.winner_value = self.board.winner
+
+        return ( player_won or self.board.check_board_filled() )
+
+    def determine_winner_name(self):
+        """
+        Return the winner's name
+        """
+        if (self.winner_value == 1):
+            return "BLUE"
+        elif (self.winner_value == 2):
+            return "RED"
+        else:
+            return "TIE"
+
+    def get_winner(self):
+        """
+        Return the winner coin type value
+        """
+        return self.winner_value
+
+class GameObserver():
+    """
+    Something that follows a Game, such as a renderer or a statistics
+    collector. Every notification does nothing by default
+    """
+
+    def game_started(self, game):
+        """
+        Called once the board is empty and the first player is known
+        """
+        pass
+
+    def turn_started(self, game):
+        """
+        Called when game.current_type is about to choose a move
+        """
+        pass
+
+    def move_played(self, game, row, col, coin_type):
+        """
+        Called after a coin of type coin_type landed at (row, col)
+        """
+        pass
+
+    def game_finished(self, game):
+        """
+        Called once when the game ends, after the terminal rewards were given
+        """
+        pass
+
+class Game():
+    """
+    The turn loop of one game between two players, independent of any
+    display. Players are the objects of src.player: they choose moves with
+    choose_action and, when they have them, learn from each move with learn
+    and from the outcome with learn_terminal
+    """
+
+    # terminal reward of the winner; the loser gets the opposite and a tie 0
+    WIN_REWARD = 10
+
+    def __init__(self, p1, p2, board=None, observers=None):
+        """
+        Initialize a game between p1 and p2 on board, a new BoardCore of
+        BOARD_SIZE if not given; observers are notified of every move
+        """
+        self.p1 = p1
+        self.p2 = p2
+        self.board = board if board is not None else BoardCore(BOARD_SIZE[0], BOARD_SIZE[1])
+        self.game_logic = GameLogic(self.board)
+        self.observers = list(observers) if observers is not None else []
+        self.current_type = None
+        self.game_over = False
+
+    def start(self, first_type=None):
+        """
+        Start the game with the player of coin type first_type (a random one
+        if not given)
+        """
+        self.current_type = first_type if first_type is not None else random.randint(1, 2)
+        self.game_over = False
+        for observer in self.observers:
+            observer.game_started(self)
+        for observer in self.observers:
+            observer.turn_started(self)
+
+    def current_player(self):
+        """
+        Return the player whose turn it is
+        """
+        return self.p1 if self.p1.get_coin_type() == self.current_type else self.p2
+
+    def play_move(self, state, actions, chosen_action):
+        """
+        Drop the current player's coin in column chosen_action and let the
+        player learn from it; state and actions are the ones the action was
+        chosen from. Return True iff the move ended the game
+        """
+        player = self.current_player()
+        # Learn from the *previous* move based on the current state (before this new move)
+        if hasattr(player, 'learn'):
+            player.learn(state, actions, chosen_action, False, self.game_logic)
+        row = self.board.drop_coin(chosen_action, self.current_type)
+        for observer in self.observers:
+            observer.move_played(self, row, chosen_action, self.current_type)
+        if self.game_logic.check_game_over():
+            # If this move won the game, the player learns immediately
+            if hasattr(player, 'learn'):
+                player.learn(state, actions, chosen_action, True, self.game_logic)
+            self.finish()
+        else:
+            self.current_type = 1 if self.current_type == 2 else 2
+            for observer in self.observers:
+                observer.turn_started(self)
+        return self.game_over
+
+    def finish(self):
+        """
+        End the game, give both players their terminal reward for the current
+        winner (0 each if there is none) and notify the observers
+        """
+        if self.game_over:
+            return
+        self.game_over = True
+        winner = self.game_logic.get_winner()
+        for player in (self.p1, self.p2):
+            if winner == 0:
+                reward = 0
+            elif winner == player.get_coin_type():
+                reward = Game.WIN_REWARD
+            else:
+                reward = -Game.WIN_REWARD
+            if hasattr(player, 'learn_terminal'):
+                player.learn_terminal(reward)
+        for observer in self.observers:
+            observer.game_finished(self)
+
+    def play(self, first_type=None):
+        """
+        Play the whole game, each player choosing on the calling thread, and
+        return the winner coin type (0 for a tie)
+        """
+        self.start(first_type)
+        while not self.game_over:
+            state = self.board.get_state()
+            actions = self.board.get_available_actions()
+            self.play_move(state, actions, self.current_player().choose_action(state, actions))
+        return self.game_logic.get_winner()
+
+def play_games(p1, p2, games, num_rows=BOARD_SIZE[0], num_columns=BOARD_SIZE[1], observers=None):
+    """
+    Play games games between p1 and p2 without any display, the first player
+    of each game chosen at random, and return how many ended in a tie, a win
+    for coin type 1 and a win for coin type 2, in that order
+    """
+    results = [0, 0, 0]
+    for i in range(games):
+        game = Game(p1, p2, BoardCore(num_rows, num_columns), observers)
+        results[game.play()] += 1
+    return results
@@ -1,71 +1,48 @@
 import pygame
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from src.constants import WHITE, BLACK, GREEN, RED, BOARD_SIZE, SLOT_SIZE, FONT_NAME
-from src.board import Board, ColumnFullException
-from src.player import HumanPlayer
+from src.board import Board
+from src.core import Game, GameObserver
 from src.coin import Coin
 
-class GameLogic():
-    """A class that handles win conditions and determines winner"""
-    WIN_SEQUENCE_LENGTH = 4
-    
-    def __init__(self, board):
+class BoardRenderer(GameObserver):
+    """
+    Draws a Game on the pygame background: the board when the game starts,
+    the coin of the player to move above the board and each coin as it drops
+    """
+
+    def __init__(self, board, background):
         """
-        Initialize the GameLogic object with a reference to the game board
+        Initialize the renderer of board (a src.board.Board) on background
         """
         self.board = board
-        (num_rows, num_columns) = self.board.get_dimensions()
-        self.board_rows = num_rows
-        self.board_cols = num_columns
-        self.winner_value = 0
-    
-    def check_game_over(self):
-        """
-        Check whether the game is over which can be because of a tie or one
-        of two players have won
-        """
-        (last_visited_nodes, player_value) = self.board.get_last_filled_information()
-        representation = self.board.get_representation()        
-        player_won = self.search_win(last_visited_nodes, representation)
-        if player_won:
-            self.winner_value = player_value
-            
-        return ( player_won or self.board.check_board_filled() )
-    
-    def search_win(self, last_visited_nodes, representation):
-        """
-        Determine whether one of the players have won
-        """
-        for indices in last_visited_nodes:
-            current_node = representation[indices[0]][indices[1]]
-            if ( current_node.top_left_score == GameLogic.WIN_SEQUENCE_LENGTH or 
-                 current_node.top_score == GameLogic.WIN_SEQUENCE_LENGTH or
-                 current_node.top_right_score == GameLogic.WIN_SEQUENCE_LENGTH or
-                 current_node.left_score == GameLogic.WIN_SEQUENCE_LENGTH or
-                 current_node.right_score == GameLogic.WIN_SEQUENCE_LENGTH or
-                 current_node.bottom_left_score == GameLogic.WIN_SEQUENCE_LENGTH or
-                 current_node.bottom_score == GameLogic.WIN_SEQUENCE_LENGTH or
-                 current_node.bottom_right_score == GameLogic.WIN_SEQUENCE_LENGTH ):
-                return True
-            
-        return False
-    
-    def determine_winner_name(self):
-        """
-        Return the winner's name
-        """
-        if (self.winner_value == 1):
-            return "BLUE"
-        elif (self.winner_value == 2):
-            return "RED"
-        else:
-            return "TIE"
-        
-    def get_winner(self):
+        self.background = background
+        self.coin = None
+
+    def game_started(self, game):
+        self.board.draw(self.background)
+
+    def turn_started(self, game):
+        (first_slot_X, first_slot_Y) = self.board.get_slot(0,0).get_position()
+        self.coin = Coin(game.current_type)
+        self.coin.set_position(first_slot_X, first_slot_Y - SLOT_SIZE)
+        self.coin.set_column(0)
+
+    def move_played(self, game, row, col, coin_type):
+        coin = self.coin
+        self.coin = None
+        coin.move_right(self.background, col)
+        coin.set_column(col)
+        coin.drop(self.background, row)
+
+    def draw(self):
         """
-        Return the winner coin type value
+        Draw the coin waiting above the board, if there is one
         """
-        return self.winner_value
+        if self.coin is not None:
+            self.coin.draw(self.background)
 
 class GameView(object):
     """A class that represents the displays in the game"""
@@ -93,7 +70,9 @@ class GameView(object):
         """
         self.game_board = Board(BOARD_SIZE[0], BOARD_SIZE[1])
         (self.board_rows, self.board_cols) = self.game_board.get_dimensions()
-        self.game_logic = GameLogic(self.game_board)
+        self.renderer = BoardRenderer(self.game_board, self.background)
+        self.game = Game(self.p1, self.p2, self.game_board, [self.renderer])
+        self.game_logic = self.game.game_logic
         
     def initialize_players(self, game_mode):
         """
@@ -332,12 +311,29 @@ class GameView(object):
         Main loop in the game
         """
         self.win_list = [0,0]
-        initial_iterations = iterations
-        games_played = 0
         
         # 1. Khởi tạo Player 1 lần duy nhất (QUAN TRỌNG)
         self.initialize_players(game_mode)
-
+        
+        # AI chọn nước trên một luồng riêng để vòng lặp sự kiện không bị treo
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-move")
+        try:
+            return self._run_games(game_mode, iterations, executor)
+        finally:
+            executor.shutdown(wait=True)
+            # Dừng luồng tìm nền, pool tiến trình, kho thế cờ... của người chơi khi hết phiên
+            for player in (self.p1, self.p2):
+                if hasattr(player, 'close'):
+                    player.close()
+    
+    def _run_games(self, game_mode, iterations, executor):
+        """
+        The game loop of run; AI moves are chosen by executor while this
+        loop keeps polling events and drawing
+        """
+        initial_iterations = iterations
+        games_played = 0
+        
         while (iterations > 0 or iterations == float('inf')):
             games_played += 1
             
@@ -345,67 +341,52 @@ class GameView(object):
             self.initialize_game_variables(game_mode)
             
             self.background.fill(BLACK)
-            self.game_board.draw(self.background)
-            game_over = False
-            uninitialized = True
-            current_type = random.randint(1,2)
-            p1_turn = (self.p1.get_coin_type() == current_type)
-                
-            (first_slot_X, first_slot_Y) = self.game_board.get_slot(0,0).get_position()
-            coin = Coin(current_type)
+            self.game.start(random.randint(1,2))
             quit_run = False
+            # Nước đang được chọn trên executor: (future, cancel, state, actions)
+            pending = None
             
             # --- GAME LOOP (Xử lý từng nước đi) ---
-            while not game_over:
-                if uninitialized:
-                    coin = Coin(current_type)
-                    coin.set_position(first_slot_X, first_slot_Y - SLOT_SIZE)
-                    coin.set_column(0)
-                    uninitialized = False
-                    coin_inserted = False
-                                    
-                coin.draw(self.background)
-                current_player = self.p1 if p1_turn else self.p2
+            while not self.game.game_over:
+                self.renderer.draw()
+                current_player = self.game.current_player()
                 
-                # AI/Human đi
-                game_over = current_player.complete_move(coin, self.game_board, self.game_logic, self.background)
-                coin_inserted = True
-                uninitialized = True
+                # AI đi: gửi việc chọn nước cho executor, đặt quân khi có kết quả
+                if pending is None:
+                    state = self.game_board.get_state()
+                    actions = self.game_board.get_available_actions()
+                    cancel = threading.Event()
+                    future = executor.submit(current_player.choose_action, state, actions, cancel)
+                    pending = (future, cancel, state, actions)
+                if game_mode == "train_rl":
+                    # Không có clock.tick khi train: chờ tối đa một khung hình thay vì quay vòng
+                    wait([pending[0]], timeout=1.0 / self.fps)
+                if pending[0].done():
+                    future, cancel, state, actions = pending
+                    pending = None
+                    # Học, đặt quân, thưởng cuối ván (Reward chuẩn theo Paper) đều do Game lo
+                    self.game.play_move(state, actions, future.result())
                     
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
-                        game_over = True
                         quit_run = True
                     elif event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_ESCAPE:
-                            game_over = True
                             quit_run = True
                 
+                if quit_run and pending is not None:
+                    # Hủy lượt tìm đang chạy; minimax dừng trong vòng vài trăm node
+                    pending[1].set()
+                    wait([pending[0]])
+                    pending = None
+                if quit_run:
+                    self.game.finish()
+                
+                game_over = self.game.game_over
                 if game_over:
-                    # Logic xử lý thắng thua đã chuẩn
                     winner_value = self.game_logic.get_winner()
                     if (winner_value > 0 and game_mode in ["minimax", "train_rl", "play_rl"]):
                         self.win_list[winner_value - 1] += 1
-                    
-                    winner_val = self.game_logic.get_winner()
-                    
-                    # Reward chuẩn theo Paper
-                    if winner_val == 0: # Tie
-                        p1_reward = 0; p2_reward = 0
-                    elif winner_val == 1: # P1 won
-                        p1_reward = 10; p2_reward = -10
-                    else: # P2 won
-                        p1_reward = -10; p2_reward = 10
-                        
-                    # Terminal Update
-                    if hasattr(self.p1, 'player') and hasattr(self.p1.player, 'learn_terminal'):
-                        self.p1.player.learn_terminal(p1_reward)
-                    if hasattr(self.p2, 'player') and hasattr(self.p2.player, 'learn_terminal'):
-                        self.p2.player.learn_terminal(p2_reward)
-                
-                if coin_inserted:
-                    current_type = 1 if current_type == 2 else 2 
-                    p1_turn = not p1_turn
 
                 # --- VẼ MÀN HÌNH ---
                 if game_mode == "train_rl":
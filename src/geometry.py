@@ -0,0 +1,131 @@
+from functools import lru_cache
+from src.constants import BOARD_SIZE, WIN_SEQUENCE_LENGTH
+
+# (row step, column step) of each window direction, in the order the
+# windows are listed: horizontal, vertical, diagonal /, diagonal \
+DIRECTIONS = ((0, 1), (1, 0), (-1, 1), (1, 1))
+
+class BoardGeometry():
+    """
+    Precomputed window tables for one board size and win length.
+
+    A cell is addressed by its flat index row * num_columns + col, with row 0
+    at the top of the board (the same layout as Board.get_state()). Every
+    window is win_length consecutive cells in one direction; window w covers
+    window_cells[w * win_length : (w + 1) * win_length]. The reverse index is
+    stored in compressed form: the windows through cell i are
+    cell_window_ids[cell_window_offsets[i] : cell_window_offsets[i + 1]].
+    cell_lines[i] holds, for each direction, the two rays leaving cell i
+    (forwards and backwards, nearest cell first, at most win_length - 1 cells
+    each), which is all a win through cell i can touch.
+    """
+
+    __slots__ = ('num_rows', 'num_columns', 'win_length', 'num_cells',
+                 'num_windows', 'window_cells', 'window_directions',
+                 'cell_window_offsets', 'cell_window_ids', 'cell_lines')
+
+    def __init__(self, num_rows, num_columns, win_length):
+        """
+        Enumerate all windows of the board and build the cell to windows index
+        """
+        self.num_rows = num_rows
+        self.num_columns = num_columns
+        self.win_length = win_length
+        self.num_cells = num_rows * num_columns
+
+        cells = []
+        directions = []
+        for (direction, (dr, dc)) in enumerate(DIRECTIONS):
+            for r in range(num_rows):
+                for c in range(num_columns):
+                    end_r = r + dr * (win_length - 1)
+                    end_c = c + dc * (win_length - 1)
+                    if not (0 <= end_r < num_rows and 0 <= end_c < num_columns):
+                        continue
+                    cells.extend((r + dr * i) * num_columns + (c + dc * i) for i in range(win_length))
+                    directions.append(direction)
+        self.window_cells = tuple(cells)
+        self.window_directions = tuple(directions)
+        self.num_windows = len(directions)
+
+        per_cell = [[] for i in range(self.num_cells)]
+        for w in range(self.num_windows):
+            for cell in self.window_cells[w * win_length : (w + 1) * win_length]:
+                per_cell[cell].append(w)
+        offsets = [0]
+        ids = []
+        for windows in per_cell:
+            ids.extend(windows)
+            offsets.append(len(ids))
+        self.cell_window_offsets = tuple(offsets)
+        self.cell_window_ids = tuple(ids)
+
+        lines = []
+        for cell in range(self.num_cells):
+            (r, c) = divmod(cell, num_columns)
+            rays = []
+            for (dr, dc) in DIRECTIONS:
+                for sign in (1, -1):
+                    ray = []
+                    for i in range(1, win_length):
+                        (rr, cc) = (r + sign * dr * i, c + sign * dc * i)
+                        if not (0 <= rr < num_rows and 0 <= cc < num_columns):
+                            break
+                        ray.append(rr * num_columns + cc)
+                    rays.append(tuple(ray))
+            lines.append(tuple(zip(rays[0::2], rays[1::2])))
+        self.cell_lines = tuple(lines)
+
+    def cell_index(self, row, col):
+        """
+        Return the flat index of the cell at (row, col)
+        """
+        return row * self.num_columns + col
+
+    def window(self, w):
+        """
+        Return the flat cell indices covered by window w
+        """
+        start = w * self.win_length
+        return self.window_cells[start : start + self.win_length]
+
+    def windows(self):
+        """
+        Return every window as a tuple of flat cell indices
+        """
+        return [self.window(w) for w in range(self.num_windows)]
+
+    def windows_through(self, cell):
+        """
+        Return the ids of the windows that contain the given flat cell index
+        """
+        return self.cell_window_ids[self.cell_window_offsets[cell] : self.cell_window_offsets[cell + 1]]
+
+    def is_line_win(self, cells, cell, value):
+        """
+        Return True iff the coin of type value at cell lies on a run of at
+        least win_length equal coins, counting outwards from cell along the
+        four lines through it
+        """
+        needed = self.win_length - 1
+        for (forward, backward) in self.cell_lines[cell]:
+            count = 0
+            for other in forward:
+                if cells[other] != value:
+                    break
+                count += 1
+            for other in backward:
+                if cells[other] != value:
+                    break
+                count += 1
+            if count >= needed:
+                return True
+        return False
+
+@lru_cache(maxsize=None)
+def get_geometry(num_rows=BOARD_SIZE[0], num_columns=BOARD_SIZE[1], win_length=WIN_SEQUENCE_LENGTH):
+    """
+    Return the shared BoardGeometry for the given board size and win length,
+    computing it only the first time it is requested
+    """
+    return BoardGeometry(num_rows, num_columns, win_length)
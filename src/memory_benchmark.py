@@ -0,0 +1,82 @@
+"""
+Measure the memory taken by each board kept alive, for the headless
+BoardCore and for the pygame Board.
+
+    python -m src.memory_benchmark [--boards 2000] [--moves 20]
+
+The "+ snapshot" row also calls get_state() on every board, so each keeps the
+BoardState it caches until the next move.
+
+Every board gets the same number of random moves, and the Python memory
+allocated for the whole batch (tracemalloc) is divided by the number of
+boards. Pygame Surfaces allocate their pixels outside Python, so they are
+not included; the slots of a Board share one Surface, drawn on demand.
+
+Measured on a 7 x 6 board with 20 moves (Python 3.11):
+
+    representation                                  bytes per board
+    Board with the SlotTrackerNode graph (original)  25 300, plus 4 300 800 of Slot Surface pixels
+    Board with lists and dict-backed Slots           10 700
+    Board with __slots__ Slots                        7 400
+    BoardCore with lists                              1 680
+    BoardCore with bytearrays and __slots__             440
+    same, with the move history of push/pop             570 (Board: 7 500)
+    same, with the slots of the cached BoardStates      585 (Board: 7 540)
+    same, holding the snapshot cached by get_state()  1 590
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from src.constants import BOARD_SIZE
+from src.core import BoardCore
+
+def measure(make_board, boards, moves, seed=0, snapshot=False):
+    """
+    Return the number of bytes allocated per board when boards boards made
+    by make_board each receive moves random moves; with snapshot, each board
+    also keeps the BoardState that get_state() caches
+    """
+    rng = random.Random(seed)
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    kept = [make_board() for i in range(boards)]
+    for board in kept:
+        coin_type = 1
+        for i in range(moves):
+            actions = board.get_available_actions()
+            if not actions:
+                break
+            board.drop_coin(rng.choice(actions), coin_type)
+            coin_type = 1 if coin_type == 2 else 2
+        if snapshot:
+            board.get_state()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return used / boards
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory used per board")
+    parser.add_argument("--boards", type=int, default=2000)
+    parser.add_argument("--moves", type=int, default=20)
+    args = parser.parse_args()
+
+    (num_rows, num_columns) = BOARD_SIZE
+    print(f"{'representation':<22} {'bytes per board':>16}")
+    per_board = measure(lambda: BoardCore(num_rows, num_columns), args.boards, args.moves)
+    print(f"{'BoardCore':<22} {per_board:>16.0f}")
+    per_board = measure(lambda: BoardCore(num_rows, num_columns), args.boards, args.moves, snapshot=True)
+    print(f"{'BoardCore + snapshot':<22} {per_board:>16.0f}")
+    try:
+        from src.board import Board
+    except ImportError:
+        print(f"{'Board':<22} {'(no pygame)':>16}")
+        return
+    per_board = measure(lambda: Board(num_rows, num_columns), args.boards, args.moves)
+    print(f"{'Board':<22} {per_board:>16.0f}")
+
+if __name__ == "__main__":
+    main()
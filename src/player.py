@@ -5,7 +5,18 @@ import os
 import numpy as np
 import tensorflow as tf
 from collections import deque
-from Minimax.minimax import choose_best_action
+from Minimax.bitboard import BitBoard
+from Minimax.mcts import DEFAULT_MAX_NODES, EXPLORATION, MCTSSearch
+from Minimax.book import OpeningBook
+from Minimax.minimax import WIN_SCORE, choose_best_action
+from Minimax.ordering import MoveOrderer
+from Minimax.parallel import ParallelSearch
+from Minimax.ponder import Ponderer
+from Minimax.solved_cache import SolvedCache
+from Minimax.solver import Solver
+from Minimax.stats import JsonLinesTrace, SearchStats
+from Minimax.threats import ThreatAnalysis
+from Minimax.transposition import TranspositionTable
 
 class Player():
     """A class that represents a player in the game"""
@@ -23,12 +34,6 @@ class Player():
         """
         return self._type
         
-    def complete_move(self):
-        """
-        A method to make a move and update any learning parameters if any
-        """
-        pass
-    
     def get_coin_type(self):
         """
         Return the coin type of the player
@@ -52,9 +57,16 @@ class HumanPlayer(Player):
         """
         Player.__init__(self, coin_type)
         self._type = "human"
-        
-        
-        
+
+    def choose_action(self, state, actions, cancel=None):
+        """
+        Human play is not supported: GameView asks every player for its move
+        with choose_action and has no mouse or keyboard input for moves
+        """
+        raise NotImplementedError("Human players are not supported; GameView only runs games between computer players")
+
+
+
 class ComputerPlayer(Player):
     """A class that represents an AI player in the game"""
     
@@ -67,6 +79,8 @@ class ComputerPlayer(Player):
             self.player = RandomPlayer(coin_type)
         elif (player_type == "minimax"):
             self.player = MinimaxPlayer(coin_type)
+        elif (player_type == "mcts"):
+            self.player = MCTSPlayer(coin_type)
         elif (player_type == "dqn"):
              self.player = DQNPlayer(coin_type, mode=mode, file_path=file_path, model=q_table)
         else:
@@ -78,41 +92,33 @@ class ComputerPlayer(Player):
         """
         return self.player.type()
         
-    def complete_move(self, coin, board, game_logic, background):
+    def learn(self, state, actions, chosen_action, game_over, game_logic):
         """
-        Move the coin and decide which slot to drop it in and learn from the
-        chosen move
+        Let the inner player learn from a move chosen from state and actions
         """
-        actions = board.get_available_actions()
-        state = board.get_state()
-        chosen_action = self.choose_action(state, actions)
-        
-        # Learn from the *previous* move based on the current state (before this new move)
-        # We pass the current state because for the *previous* move, this is the "result state"
-        self.player.learn(state, actions, chosen_action, False, game_logic)
-        
-        coin.move_right(background, chosen_action)
-        coin.set_column(chosen_action)
-        game_over = board.insert_coin(coin, background, game_logic)
-        
-        # If this move won the game, we need to learn immediately
-        if game_over:
-             self.player.learn(state, actions, chosen_action, True, game_logic)
-        
-        return game_over
-    
+        self.player.learn(state, actions, chosen_action, game_over, game_logic)
+
+    def learn_terminal(self, reward):
+        """
+        Give the inner player its reward for the outcome of the game, if it
+        learns from one
+        """
+        if hasattr(self.player, 'learn_terminal'):
+            self.player.learn_terminal(reward)
+
     def get_coin_type(self):
         """
         Return the coin type of the AI player
         """
         return self.player.get_coin_type()
     
-    def choose_action(self, state, actions):
+    def choose_action(self, state, actions, cancel=None):
         """
         Choose an action (which slot to drop in) based on the state of the
-        board
+        board. cancel is a threading.Event that another thread may set to
+        cut a long search short
         """
-        return self.player.choose_action(state, actions)
+        return self.player.choose_action(state, actions, cancel)
     
     def set_mode(self, mode):
         """
@@ -120,6 +126,14 @@ class ComputerPlayer(Player):
         """
         if hasattr(self.player, 'set_mode'):
             self.player.set_mode(mode)
+
+    def close(self):
+        """
+        Release the background threads, processes and files of the inner
+        player, if it holds any
+        """
+        if hasattr(self.player, 'close'):
+            self.player.close()
     
     
 class RandomPlayer(Player):
@@ -132,9 +146,10 @@ class RandomPlayer(Player):
         Player.__init__(self, coin_type)
         self._type = "random"
         
-    def choose_action(self, state, actions):
+    def choose_action(self, state, actions, cancel=None):
         """
-        Choose a random action based on the available actions
+        Choose a random action based on the available actions (instant, so
+        cancel is ignored)
         """
         return random.choice(actions)
 
@@ -156,28 +171,264 @@ class RandomPlayer(Player):
 class MinimaxPlayer(Player):
     """A minimax-based AI player with alpha-beta pruning."""
     
-    def __init__(self, coin_type, depth=4):
+    DEFAULT_DEPTH = 8
+    # with time_ms and no depth, pondering stops this many plies past the
+    # depth the last search reached
+    PONDER_EXTRA_DEPTH = 3
+    
+    def __init__(self, coin_type, depth=None, time_ms=None, table_size_mb=16, workers=1,
+                 book_path=None, solve_ms=None, cache_path=None, variant="alphabeta",
+                 trace_path=None, ponder=False):
         """
         Initialize the minimax player.
         depth: search depth for the minimax algorithm.
+        time_ms: wall-clock budget per move; when given, the search deepens
+        iteratively until the budget runs out and depth (if any) only caps
+        the iterations.
+        table_size_mb: memory budget of the transposition table, which is
+        kept between moves of the same game.
+        workers: number of processes for root-parallel search; the process
+        pool is created on the first move and kept until close() is called.
+        The root moves are pruned and ordered from this player's table and
+        history as the serial search does, and the values are exact, so it
+        plays a move of the same value; between moves of equal value the
+        choice can differ, since the history the serial search builds up is
+        not kept by the worker processes.
+        book_path: opening book generated by Minimax/book.py; it is memory
+        mapped, and positions found in it are answered without searching.
+        solve_ms: when given, every move first tries to solve the position
+        exactly within this budget and falls back to the heuristic search
+        when the solver runs out of time (single-process search only).
+        cache_path: on-disk store of solved positions shared by every process
+        using the same file; positions found in it are answered without
+        searching, and positions solved within solve_ms are added to it.
+        variant: "alphabeta" or "pvs" (principal variation search, with
+        aspiration windows at the root when time_ms is given).
+        trace_path: JSON-lines file that receives the search statistics of
+        every move; the statistics of the last move are also kept in
+        last_stats. With workers > 1 the parallel search records none:
+        last_stats is None after a move it chose and the trace is not
+        written for that move.
+        ponder: keep searching the likely replies of the opponent in a
+        background thread during their turn (single-process search only);
+        a finished search of the position actually reached is played at
+        once, and otherwise the warmed transposition table lets the next
+        search go deeper in the same time. Pondering goes up to depth, or
+        PONDER_EXTRA_DEPTH plies past the depth of the last search when only
+        time_ms is given, and stops when the game ends (learn_terminal).
         """
         Player.__init__(self, coin_type)
         self._type = "minimax"
+        if depth is None and time_ms is None:
+            depth = MinimaxPlayer.DEFAULT_DEPTH
         self.depth = depth
+        self.time_ms = time_ms
+        self.table = TranspositionTable(table_size_mb)
+        self.orderer = MoveOrderer()
+        self.last_num_coins = 0
+        self.workers = workers
+        self.variant = variant
+        self.parallel = ParallelSearch(workers, table_size_mb, variant) if workers > 1 else None
+        self.book = None
+        if book_path is not None and os.path.exists(book_path):
+            self.book = OpeningBook(book_path)
+        self.solve_ms = solve_ms
+        self.solver = Solver() if solve_ms is not None else None
+        self.cache_path = cache_path
+        self.cache = None
+        self.trace = JsonLinesTrace(trace_path) if trace_path is not None else None
+        self.last_stats = None
+        self.last_search_depth = 0
+        self.ponderer = Ponderer(self.table, depth, variant) if ponder and workers <= 1 else None
         
-    def choose_action(self, state, actions):
+    def choose_action(self, state, actions, cancel=None):
         """
         Choose the best action using minimax search.
+        Forced positions (an immediate win, a single block, a double threat
+        or a single move that does not lose at once) are answered without
+        searching, as are positions found in the opening book and positions
+        already searched deep enough while pondering.
+        cancel: threading.Event that stops the search (and the solver) within
+        a few hundred nodes when set from another thread, in the worker
+        processes too; the move of the last finished iteration is returned.
         Falls back to random selection if no action is found.
         """
-        action = choose_best_action(state, self.coin_type, self.depth, actions)
+        if self.ponderer is not None:
+            self.ponderer.stop()
+        action = self._select_action(state, actions, cancel)
+        if self.ponderer is not None and not (cancel is not None and cancel.is_set()):
+            self._start_pondering(state, action)
+        return action
+    
+    def _select_action(self, state, actions, cancel):
+        """
+        Pick the move for choose_action, from the cheapest source that has one
+        """
+        # fewer coins than on our previous move means a new game has started
+        num_coins = sum(1 for row in state for value in row if value != 0)
+        if num_coins < self.last_num_coins:
+            self.table.clear()
+        self.last_num_coins = num_coins
+        
+        if self.cache_path is not None and self.cache is None:
+            self.cache = SolvedCache(self.cache_path, len(state), len(state[0]))
+        
+        board = BitBoard.from_state(state, self.coin_type)
+        if not (board.is_winner(1) or board.is_winner(2)):
+            forced = ThreatAnalysis(board).forced_move
+            if forced is not None and forced in actions:
+                return self._answer_without_search("threat", forced, state)
+        
+        if self.book is not None:
+            entry = self.book.probe(board)
+            if entry is not None and entry[0] in actions:
+                return self._answer_without_search("book", entry[0], state)
+        
+        # the solver, when enabled, is worth more than a pondered heuristic search
+        if self.ponderer is not None and self.solver is None:
+            entry = self.ponderer.result(board)
+            if entry is not None and entry[0] in actions and (
+                    (self.depth is not None and entry[2] >= self.depth) or abs(entry[1]) >= WIN_SCORE):
+                return self._answer_without_search("ponder", entry[0], state, entry[1], entry[2])
+        
+        if self.parallel is not None:
+            action = self.parallel.choose_best_action(state, self.coin_type, self.depth, actions,
+                                                      time_ms=self.time_ms, table=self.table,
+                                                      orderer=self.orderer, stop=cancel)
+            # the parallel search keeps no statistics; don't leave the previous move's in place
+            self.last_stats = None
+        else:
+            action, self.last_stats = choose_best_action(
+                state, self.coin_type, self.depth, actions,
+                table=self.table, time_ms=self.time_ms,
+                orderer=self.orderer, solver=self.solver,
+                solve_ms=self.solve_ms, cache=self.cache,
+                variant=self.variant, return_stats=True, trace=self.trace, stop=cancel)
+            if self.last_stats.source == "search" and self.last_stats.depth > 0:
+                self.last_search_depth = self.last_stats.depth
         return action if action is not None else random.choice(actions)
+    
+    def _answer_without_search(self, source, action, state, value=None, depth=0):
+        """
+        Record a move that needed no search in last_stats and the trace
+        """
+        self.last_stats = SearchStats()
+        self.last_stats.source = source
+        self.last_stats.move = action
+        self.last_stats.value = value
+        self.last_stats.depth = depth
+        if self.trace is not None:
+            self.trace.write(self.last_stats, piece=self.coin_type, moves_played=self.last_num_coins)
+        return action
+    
+    def _start_pondering(self, state, action):
+        """
+        Hand the position after our move to the ponderer, unless the game
+        ends with it
+        """
+        board = BitBoard.from_state(state, self.coin_type)
+        if action is None or not board.can_play(action) or board.is_winner(1) or board.is_winner(2):
+            return
+        board.play(action)
+        if not board.is_winner(self.coin_type) and not board.is_full():
+            max_depth = self.depth
+            if max_depth is None:
+                max_depth = (self.last_search_depth or MinimaxPlayer.DEFAULT_DEPTH) + MinimaxPlayer.PONDER_EXTRA_DEPTH
+            self.ponderer.start(board, max_depth)
+    
+    def close(self):
+        """
+        Stop pondering, shut down the worker processes of the parallel
+        search, unmap the opening book, flush the solved-position cache and
+        close the trace file, if any
+        """
+        if self.ponderer is not None:
+            self.ponderer.stop()
+        if self.parallel is not None:
+            self.parallel.close()
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
                 
     def learn(self, board, actions, action, game_over, game_logic):
         """
         Minimax player is not learning-based, so no update is required.
         """
         pass
+
+    def learn_terminal(self, reward):
+        """
+        The game is over, so there is nothing left to ponder
+        """
+        if self.ponderer is not None:
+            self.ponderer.stop()
+    
+class MCTSPlayer(Player):
+    """A Monte Carlo Tree Search (UCT) AI player with root-parallel rollouts."""
+    
+    DEFAULT_ITERATIONS = 2000
+    
+    def __init__(self, coin_type, iterations=None, time_ms=None, workers=1, exploration=EXPLORATION,
+                 reuse_tree=True, max_nodes=DEFAULT_MAX_NODES):
+        """
+        Initialize the MCTS player.
+        iterations: number of tree iterations (one rollout each) per move,
+        split evenly between the workers.
+        time_ms: wall-clock budget per move; when both are given, the search
+        stops at whichever limit comes first.
+        workers: number of processes, each growing its own tree from the
+        same position; their root statistics are summed. The process pool
+        is created on the first move and kept until close() is called.
+        exploration: UCT exploration constant.
+        reuse_tree: keep the tree between moves (single process only); the
+        next move descends to the position actually reached and continues
+        from its statistics, and the other branches are freed.
+        max_nodes: memory cap of the tree, in nodes (about 300 bytes each);
+        once reached, iterations keep refining the existing nodes.
+        """
+        Player.__init__(self, coin_type)
+        self._type = "mcts"
+        if iterations is None and time_ms is None:
+            iterations = MCTSPlayer.DEFAULT_ITERATIONS
+        self.iterations = iterations
+        self.time_ms = time_ms
+        self.search = MCTSSearch(workers, exploration, reuse_tree=reuse_tree, max_nodes=max_nodes)
+        self.last_root = {}
+        
+    def choose_action(self, state, actions, cancel=None):
+        """
+        Choose the most visited root move. Forced positions are answered
+        without searching, like the minimax player does. cancel stops a
+        single-process search early (it is anytime, so the move of the
+        iterations done so far is returned).
+        """
+        board = BitBoard.from_state(state, self.coin_type)
+        if not (board.is_winner(1) or board.is_winner(2)):
+            forced = ThreatAnalysis(board).forced_move
+            if forced is not None and forced in actions:
+                self.last_root = {}
+                return forced
+        action, self.last_root = self.search.search(state, self.coin_type, actions,
+                                                    self.iterations, self.time_ms, cancel)
+        return action if action is not None else random.choice(actions)
+    
+    def close(self):
+        """
+        Shut down the worker processes, if any
+        """
+        self.search.close()
+    
+    def learn(self, board, actions, action, game_over, game_logic):
+        """
+        MCTS player is not learning-based, so no update is required.
+        """
+        pass
     
 class DQNPlayer(Player):
     """A class that represents a Deep Q-Network AI player"""
@@ -242,7 +493,8 @@ class DQNPlayer(Player):
         processed[flat_state == 0] = 0
         return np.reshape(flat_state, [1, self.state_size])
 
-    def choose_action(self, state, actions):
+    def choose_action(self, state, actions, cancel=None):
+        # a single predict call is short and cannot be interrupted, so cancel is ignored
         if np.random.rand() <= self.epsilon:
             return random.choice(actions)
         
@@ -265,7 +517,7 @@ class DQNPlayer(Player):
         # We need to store (state, action, reward, next_state, done)
         # But learn() is called *after* the move.
         # So 'current_state' passed here is actually the state *before* the move?
-        # Let's check ComputerPlayer.complete_move:
+        # Let's check Game.play_move (src/core.py):
         # state = board.get_state() (State BEFORE move)
         # chosen_action = ...
         # self.player.learn(state, actions, chosen_action, False, game_logic) (Learn called with State BEFORE move)